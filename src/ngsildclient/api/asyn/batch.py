@@ -10,19 +10,19 @@
 # Author: Fabien BATTELLO <fabien.battello@orange.com> et al.
 
 from __future__ import annotations
-from typing import TYPE_CHECKING, Sequence, Literal
+from typing import TYPE_CHECKING, Awaitable, Callable, Sequence, Literal
 
+import asyncio
 import logging
-import json
 
 if TYPE_CHECKING:
     from .client import AsyncClient, EntityOrId
 
-from ..constants import BATCHSIZE
+from ..constants import BATCHSIZE, CONCURRENCY
 from ..exceptions import NgsiApiError, rfc7807_error_handle_async
-from ..batch import BatchResult
+from ..batch import BatchOp, BatchResult
 from ...model.entity import Entity
-from ngsildclient.model.utils import NgsiEncoder
+from ngsildclient.model.utils import decode_json, encode_json
 
 logger = logging.getLogger(__name__)
 
@@ -34,47 +34,69 @@ class Batch:
         self._client = client
         self._session = client.client
         self.url = url
+        self._url_create = f"{url}/create/"
+        self._url_upsert = f"{url}/upsert/"
+        self._url_update = f"{url}/update/"
+        self._url_delete = f"{url}/delete/"
+
+    async def _run(
+        self,
+        op: BatchOp,
+        fn: Callable[[Sequence], Awaitable[BatchResult]],
+        entities: Sequence,
+        batchsize: int,
+        concurrency: int,
+    ) -> BatchResult:
+        """Split entities into batches and send them concurrently, gathering the results in order."""
+        semaphore = asyncio.Semaphore(max(concurrency, 1))
+
+        async def send(batch: Sequence) -> BatchResult:
+            async with semaphore:
+                return await fn(batch)
+
+        r = BatchResult(op)
+        batches = [entities[i : i + batchsize] for i in range(0, len(entities), batchsize)]
+        for result in await asyncio.gather(*(send(batch) for batch in batches)):
+            r += result
+        return r
 
     @rfc7807_error_handle_async
     async def _create(self, entities: Sequence[Entity]) -> BatchResult:
         headers = {"Content-Type": "application/ld+json"}
-        r = await self._session.post(
-            f"{self.url}/create/", headers=headers, content=json.dumps([e for e in entities], cls=NgsiEncoder)
-        )
+        r = await self._session.post(self._url_create, headers=headers, content=encode_json(entities))
         self._client.raise_for_status(r)
         if r.status_code == 201:
-            success, errors = r.json(), []
+            success, errors = decode_json(r.content), []
         elif r.status_code == 207:
-            content = r.json()
+            content = decode_json(r.content)
             success, errors = content["success"], content["errors"]
         else:
             raise NgsiApiError("Batch Create : Unkown HTTP response code {}", r.status_code)
         return BatchResult("create", success, errors)
 
     @rfc7807_error_handle_async
-    async def create(self, entities: Sequence[Entity], batchsize: int = BATCHSIZE) -> BatchResult:
-        r = BatchResult("create")
-        for i in range(0, len(entities), batchsize):
-            r += await self._create(entities[i : i + batchsize])
-        return r
+    async def create(
+        self, entities: Sequence[Entity], batchsize: int = BATCHSIZE, concurrency: int = CONCURRENCY
+    ) -> BatchResult:
+        return await self._run("create", self._create, entities, batchsize, concurrency)
 
     @rfc7807_error_handle_async
     async def _upsert(self, entities: Sequence[Entity], opt: Literal["replace", "update"] = "replace") -> BatchResult:
         headers = {"Content-Type": "application/ld+json"}
         params = {"options": opt} if opt else {}
         r = await self._session.post(
-            f"{self.url}/upsert/",
-            content=json.dumps([e for e in entities], cls=NgsiEncoder),
+            self._url_upsert,
+            content=encode_json(entities),
             headers=headers,
             params=params,
         )
         self._client.raise_for_status(r)
         if r.status_code == 201:
-            success, errors = r.json(), []
+            success, errors = decode_json(r.content), []
         elif r.status_code == 204:
             success, errors = [e.id for e in entities], []
         elif r.status_code == 207:
-            content = r.json()
+            content = decode_json(r.content)
             success, errors = content["success"], content["errors"]
         else:
             raise NgsiApiError("Batch Upsert : Unkown HTTP response code {}", r.status_code)
@@ -82,22 +104,24 @@ class Batch:
 
     @rfc7807_error_handle_async
     async def upsert(
-        self, entities: Sequence[Entity], *, update: bool = False, batchsize: int = BATCHSIZE
+        self,
+        entities: Sequence[Entity],
+        *,
+        update: bool = False,
+        batchsize: int = BATCHSIZE,
+        concurrency: int = CONCURRENCY,
     ) -> BatchResult:
         # default mode (without any option) is "replace", anyway always force the option
         opt = "update" if update else "replace"
-        r = BatchResult("upsert")
-        for i in range(0, len(entities), batchsize):
-            r += await self._upsert(entities[i : i + batchsize], opt)
-        return r
+        return await self._run("upsert", lambda batch: self._upsert(batch, opt), entities, batchsize, concurrency)
 
     @rfc7807_error_handle_async
     async def _update(self, entities: Sequence[Entity], opt: Literal["noOverwrite"] = None) -> BatchResult:
         headers = {"Content-Type": "application/ld+json"}
         params = {"options": opt} if opt else {}
         r = await self._session.post(
-            f"{self.url}/update/",
-            content=json.dumps([e for e in entities], cls=NgsiEncoder),
+            self._url_update,
+            content=encode_json(entities),
             headers=headers,
             params=params,
         )
@@ -105,7 +129,7 @@ class Batch:
         if r.status_code == 204:
             success, errors = [e.id for e in entities], []
         elif r.status_code == 207:
-            content = r.json()
+            content = decode_json(r.content)
             success, errors = content["success"], content["errors"]
         else:
             raise NgsiApiError("Batch Update : Unkown HTTP response code {}", r.status_code)
@@ -113,32 +137,34 @@ class Batch:
 
     @rfc7807_error_handle_async
     async def update(
-        self, entities: Sequence[Entity], *, overwrite: bool = True, batchsize: int = BATCHSIZE
+        self,
+        entities: Sequence[Entity],
+        *,
+        overwrite: bool = True,
+        batchsize: int = BATCHSIZE,
+        concurrency: int = CONCURRENCY,
     ) -> BatchResult:
         opt = "noOverwrite" if not overwrite else None
-        r = BatchResult("update")
-        for i in range(0, len(entities), batchsize):
-            r += await self._update(entities[i : i + batchsize], opt)
-        return r
+        return await self._run("update", lambda batch: self._update(batch, opt), entities, batchsize, concurrency)
 
     @rfc7807_error_handle_async
     async def _delete(self, entities: Sequence[EntityOrId]) -> BatchResult:
+        ids = [e.id if isinstance(e, Entity) else e for e in entities]
         r = await self._session.post(
-            f"{self.url}/delete/", json=[e.id if isinstance(e, Entity) else e for e in entities]
+            self._url_delete, headers={"Content-Type": "application/json"}, content=encode_json(ids)
         )
         self._client.raise_for_status(r)
         if r.status_code == 204:
-            success, errors = [e.id for e in entities], []
+            success, errors = ids, []
         elif r.status_code == 207:
-            content = r.json()
+            content = decode_json(r.content)
             success, errors = content["success"], content["errors"]
         else:
             raise NgsiApiError("Batch Delete : Unkown HTTP response code {}", r.status_code)
         return BatchResult("delete", success, errors)
 
     @rfc7807_error_handle_async
-    async def delete(self, entities: Sequence[EntityOrId], batchsize: int = BATCHSIZE) -> BatchResult:
-        r = BatchResult("delete")
-        for i in range(0, len(entities), batchsize):
-            r += await self._delete(entities[i : i + batchsize])
-        return r
+    async def delete(
+        self, entities: Sequence[EntityOrId], batchsize: int = BATCHSIZE, concurrency: int = CONCURRENCY
+    ) -> BatchResult:
+        return await self._run("delete", self._delete, entities, batchsize, concurrency)
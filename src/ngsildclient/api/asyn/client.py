@@ -14,10 +14,12 @@ from __future__ import annotations
 import logging
 import httpx
 from httpx._types import AuthTypes
-from typing import TYPE_CHECKING, Generator, List, Union, Callable
+from typing import TYPE_CHECKING, Generator, List, Dict, Optional, Union, Callable, Sequence
 from math import ceil
 
 from ...model.entity import Entity
+from ...model.utils import encode_json
+from ...utils import is_h2_installed
 from ..constants import (
     NGSILD_DEFAULT_PORT,
     NGSILD_TEMPORAL_PORT,
@@ -30,6 +32,8 @@ from ..constants import (
     ENDPOINT_SUBSCRIPTIONS,
     NGSILD_BASEPATH,
     PAGINATION_LIMIT_MAX,
+    POOL_SIZE,
+    MAX_CONNECTIONS,
 )
 from .entities import Entities
 from .batch import Batch, BatchResult
@@ -91,8 +95,10 @@ class AsyncClient:
         tenant: str = None,
         overwrite: bool = False,
         ignore_errors: bool = False,
-        proxy: str = None,
+        proxy: Union[str, Dict[str, str]] = None,
         custom_auth: AuthTypes = None,
+        http2: Optional[bool] = None,
+        pool_size: int = POOL_SIZE,
     ):
         """Create a Client instance to interact with the Context Broker.
 
@@ -118,8 +124,15 @@ class AsyncClient:
             if set create() will behave like upsert(), by default False
         ignore_errors : bool, optional
             if set tests the connection at init time and raisesan exception if failed, by default False
-        proxy : str, optional
+        proxy : Union[str, Dict[str, str]], optional
             proxies all requests to the provided proxy string (for debugging purpose), by default None
+            A dict mapping URL patterns to proxies (as expected by httpx) is also accepted.
+        http2 : bool, optional
+            if set enables HTTP/2 so that concurrent requests are multiplexed over a single connection,
+            by default enabled if the h2 package is installed (pip install ngsildclient[http2]).
+            HTTP/2 is negotiated during the TLS handshake : plain HTTP connections remain HTTP/1.1.
+        pool_size : int, optional
+            the maximum number of connections kept alive to the Context Broker, by default POOL_SIZE
 
         See Also
         --------
@@ -145,10 +158,18 @@ class AsyncClient:
         }
         if tenant is not None:
             headers["NGSILD-Tenant"] = tenant
-        proxies = {proxy} if proxy else None
+        proxies = proxy or None  # httpx accepts either a single proxy URL or a dict of them
+        if http2 is None:
+            http2 = is_h2_installed()
 
         logger.info("Connecting client ...")
-        self.client = httpx.AsyncClient(auth=custom_auth, headers=headers, proxies=proxies)
+        self.client = httpx.AsyncClient(
+            auth=custom_auth,
+            headers=headers,
+            proxies=proxies,
+            http2=http2,
+            limits=httpx.Limits(max_connections=max(MAX_CONNECTIONS, pool_size), max_keepalive_connections=pool_size),
+        )
         self._entities = Entities(self, f"{self.url}/{ENDPOINT_ENTITIES}")
         self._batch = Batch(self, f"{self.url}/{ENDPOINT_BATCH}")
         self._types = Types(self, f"{self.url}/{ENDPOINT_TYPES}")
@@ -204,6 +225,18 @@ class AsyncClient:
         """
         await self.client.aclose()
 
+    def _single_or_batch(self, entities: tuple, single_fn: Callable, batch_fn: Callable, **kwargs):
+        """Dispatch the facade arguments to the single entity method or to the batch method.
+
+        Entities are either a single Entity (or entity id), or an iterable of entities, or comma-separated entities.
+        """
+        if len(entities) == 1:
+            entity = entities[0]
+            if isinstance(entity, (Entity, str)):
+                return single_fn(entity)
+            entities = entity if isinstance(entity, Sequence) else list(entity)  # ie. a generator
+        return batch_fn(entities, **kwargs)
+
     async def create(self, *entities) -> Union[bool, BatchResult]:
         """Create one or many entities.
 
@@ -220,13 +253,7 @@ class AsyncClient:
         Entity
             The entities successfully upserted
         """
-        if len(entities) == 1:
-            if isinstance(entities[0], Entity):
-                entity = entities[0]
-                return await self.entities.create(entity)
-            else:
-                entities = entities[0]
-        return await self.batch.create(entities)
+        return await self._single_or_batch(entities, self.entities.create, self.batch.create)
 
     async def get(
         self,
@@ -272,13 +299,7 @@ class AsyncClient:
         Entity
             The entities successfully upserted
         """
-        if len(entities) == 1:
-            if isinstance(entities[0], Entity):
-                entity = entities[0]
-                return await self.entities.delete(entity)
-            else:
-                entities = entities[0]
-        return await self.batch.delete(entities)
+        return await self._single_or_batch(entities, self.entities.delete, self.batch.delete)
 
     async def delete_from_file(self, filename: str) -> Union[bool, dict]:
         """Delete in the broker all entities present in the JSON file.
@@ -330,13 +351,7 @@ class AsyncClient:
         Entity
             The entities successfully upserted
         """
-        if len(entities) == 1:
-            if isinstance(entities[0], Entity):
-                entity = entities[0]
-                return await self.entities.upsert(entity)
-            else:
-                entities = entities[0]
-        return await self.batch.upsert(entities, update=update)
+        return await self._single_or_batch(entities, self.entities.upsert, self.batch.upsert, update=update)
 
     async def bulk_import(self, filename: str) -> Union[bool, dict]:
         """Upsert all entities from a JSON file.
@@ -370,13 +385,7 @@ class AsyncClient:
         Entity
             The entities successfully updated
         """
-        if len(entities) == 1:
-            if isinstance(entities[0], Entity):
-                entity = entities[0]
-                return await self.entities.update(entity)
-            else:
-                entities = entities[0]
-        return await self.batch.update(entities, overwrite=overwrite)
+        return await self._single_or_batch(entities, self.entities.update, self.batch.update, overwrite=overwrite)
 
     async def query_head(
         self, type: str = None, q: str = None, gq: str = None, ctx: str = None, n: int = 5
@@ -638,7 +647,7 @@ class AsyncClient:
         }
         return await self.client.post(
             f"{self.url}/{ENDPOINT_BATCH}/upsert/",
-            json=[payload],
+            content=encode_json([payload]),
             headers={"Content-Type": "application/ld+json", "NGSILD-Tenant": tenant},
         )
 
@@ -20,6 +20,9 @@ if TYPE_CHECKING:
     from .client import AsyncClient
 
 from ngsildclient.model.constants import CORE_CONTEXT
+from ngsildclient.model.utils import decode_json, encode_json
+from ..constants import HEAD_NOT_SUPPORTED, KIND_NOT_SUPPORTED
+from ..contexts import ContextKind, _filter_kind
 from ..exceptions import rfc7807_error_handle_async
 
 
@@ -31,26 +34,38 @@ class Contexts:
         self._client = client
         self._session = client.client
         self.url = url
+        self._url_slash = f"{url}/"
+        self._head = True  # check existence with HEAD until the broker rejects it
 
     @rfc7807_error_handle_async
-    async def list(self, pattern: str = None) -> Optional[dict]:
-        r = await self._session.get(f"{self.url}")
-        contexts = r.json()
+    async def list(self, pattern: str = None, kind: ContextKind = None) -> Optional[dict]:
+        """List the contexts, optionally filtered by kind and by regex pattern.
+
+        The kind filter is sent to the broker along with a request for details, so that it can be applied again
+        on the client side if the broker ignores it. A broker rejecting it is queried again without it.
+        """
+        r = await self._session.get(self.url, params={"kind": kind, "details": "true"} if kind else None)
+        if kind and r.status_code in KIND_NOT_SUPPORTED:
+            r = await self._session.get(self.url, params={"details": "true"})
+        contexts = decode_json(r.content)
+        if kind:
+            contexts = _filter_kind(contexts, kind)
         if pattern is not None:
-            contexts = [x for x in contexts if re.search(pattern, x, re.IGNORECASE)]
+            prog = re.compile(pattern, re.IGNORECASE)
+            contexts = [x for x in contexts if prog.search(x)]
         return contexts
 
     @rfc7807_error_handle_async
     async def get(self, ctx: str) -> dict:
-        r = await self._session.get(f"{self.url}/{ctx}")
+        r = await self._session.get(self._url_slash + ctx)
         self._client.raise_for_status(r)
-        return r.json()
+        return decode_json(r.content)
 
     @rfc7807_error_handle_async
     async def _delete(self, ctx: str) -> bool:
-        r = await self._session.delete(f"{self.url}/{ctx}")
+        r = await self._session.delete(self._url_slash + ctx)
         self._client.raise_for_status(r)
-        return bool(r)
+        return r.is_success
 
     @rfc7807_error_handle_async
     async def delete(self, ctx: str, pattern: str = None) -> bool:
@@ -64,9 +79,14 @@ class Contexts:
 
     @rfc7807_error_handle_async
     async def exists(self, ctx: str) -> bool:
-        r = await self._session.get(f"{self.url}/{ctx}")
+        if self._head:
+            r = await self._session.head(self._url_slash + ctx)
+            if r.status_code not in HEAD_NOT_SUPPORTED:
+                return r.is_success
+            self._head = False
+        r = await self._session.get(self._url_slash + ctx)
         if r:
-            payload = r.json()
+            payload = decode_json(r.content)
             return "@context" in payload
         return False
 
@@ -81,7 +101,9 @@ class Contexts:
     async def add(self, ctx: dict):
         if not ctx.get("@context"):
             raise ValueError("Expect a JSON object that has a top-level field named @context.")
-        r = await self._session.post(f"{self.url}/", json=ctx)
+        r = await self._session.post(
+            self._url_slash, headers={"Content-Type": "application/json"}, content=encode_json(ctx)
+        )
         self._client.raise_for_status(r)
 
     @rfc7807_error_handle_async
@@ -11,6 +11,7 @@
 
 from __future__ import annotations
 from typing import TYPE_CHECKING, Union, List
+from types import MappingProxyType
 from httpx import Response
 import logging
 
@@ -18,27 +19,36 @@ if TYPE_CHECKING:
     from .client import AsyncClient
 
 from ...utils.urn import Urn
-from ..constants import JSONLD_CONTEXT, ENDPOINT_ENTITIES
+from ..constants import ENDPOINT_ENTITIES, HEAD_NOT_SUPPORTED
 from ...model.entity import Entity
+from ...model.utils import decode_json
 
 from ..exceptions import rfc7807_error_handle_async, NgsiAlreadyExistsError
+from ..entities import _with_context
 
 logger = logging.getLogger(__name__)
 
+# request headers overriding the session ones, shared by all requests
+HEADERS_GET = MappingProxyType({"Accept": "application/ld+json"})
+HEADERS_COUNT = MappingProxyType({"Accept": "application/json"})
+
 
 class Entities:
     def __init__(self, client: AsyncClient, url: str):
         self._client = client
         self.url = url
+        self._url_slash = f"{url}/"
+        self._url_broker = f"{client.scheme}://{client.hostname}:{client.port}/{ENDPOINT_ENTITIES}/"
+        self._head = True  # check existence with HEAD until the broker rejects it
 
     def to_broker_url(self, eid: Union[str, Entity]) -> str:
         eid = eid.id if isinstance(eid, Entity) else Urn.prefix(eid)
-        return f"http://{self._client.hostname}:{self._client.port}/{ENDPOINT_ENTITIES}/{eid}"
+        return self._url_broker + eid
 
     @rfc7807_error_handle_async
     async def create(self, entity: Entity, skip: bool = False, overwrite: bool = False) -> bool:
         headers = {"Content-Type": "application/ld+json"}
-        r: Response = await self._client.client.post(url=f"{self.url}/", headers=headers, content=entity.to_json())
+        r: Response = await self._client.client.post(url=self._url_slash, headers=headers, content=entity.to_json())
         if r.status_code == 409:  # already exists
             if skip:
                 return False
@@ -57,30 +67,34 @@ class Entities:
         **kwargs,
     ) -> Entity:
         eid = eid.id if isinstance(eid, Entity) else Urn.prefix(eid)
-        headers = {"Accept": "application/ld+json"}  # overrides session headers
-        if ctx is not None:
-            headers["Link"] = f'<{ctx}>; rel="{JSONLD_CONTEXT}"; type="application/ld+json"'
+        headers = _with_context(HEADERS_GET, ctx)
         logger.info(f"{headers=}")
-        r: Response = await self._client.client.get(f"{self.url}/{eid}", headers=headers, **kwargs)
+        r: Response = await self._client.client.get(self._url_slash + eid, headers=headers, **kwargs)
         r.raise_for_status()
-        return r.json() if asdict else Entity.from_dict(r.json())
+        payload = decode_json(r.content)
+        return payload if asdict else Entity.from_dict(payload)
 
     @rfc7807_error_handle_async
     async def delete(self, eid: Union[str, Entity]) -> bool:
         eid = eid.id if isinstance(eid, Entity) else Urn.prefix(eid)
         logger.info(f"{eid=}")
         logger.info(f"url={self.url}/{eid}")
-        r: Response = await self._client.client.delete(f"{self.url}/{eid}")
+        r: Response = await self._client.client.delete(self._url_slash + eid)
         logger.info(f"requests: {r.request.url}")
         r.raise_for_status()
-        return bool(r)
+        return r.is_success
 
     @rfc7807_error_handle_async
     async def exists(self, eid: Union[str, Entity]) -> bool:
         eid = eid.id if isinstance(eid, Entity) else Urn.prefix(eid)
-        r: Response = await self._client.client.get(f"{self.url}/{eid}")
+        if self._head:
+            r: Response = await self._client.client.head(self._url_slash + eid)
+            if r.status_code not in HEAD_NOT_SUPPORTED:
+                return r.is_success
+            self._head = False
+        r: Response = await self._client.client.get(self._url_slash + eid)
         if r:
-            payload = r.json()
+            payload = decode_json(r.content)
             return "@context" in payload
         return False
 
@@ -112,9 +126,9 @@ class Entities:
     ) -> List[Entity]:
         params = {}
         if limit != 0:
-            params |= {"limit": limit}
+            params["limit"] = limit
         if offset != 0:
-            params |= {"offset": offset}
+            params["offset"] = offset
         if type is None and q is None:
             raise ValueError("Must indicate at least a type or a query string")
         if type:
@@ -123,20 +137,16 @@ class Entities:
             params["q"] = q
         if gq:
             params["geoQ"] = gq
-        headers = {
-            "Accept": "application/ld+json",
-        }  # overrides session headers
-        if ctx is not None:
-            headers["Link"] = f'<{ctx}>; rel="{JSONLD_CONTEXT}"; type="application/ld+json"'
+        headers = _with_context(HEADERS_GET, ctx)
         r: Response = await self._client.client.get(
             self.url,
             headers=headers,
             params=params,
         )
         r.raise_for_status()
-        entities = r.json()
-        logger.debug(f"{entities=}")
-        return [Entity.from_dict(entity) for entity in entities]
+        entities = decode_json(r.content)
+        logger.debug("entities=%s", entities)
+        return Entity.from_dicts(entities)
 
     @rfc7807_error_handle_async
     async def count(self, type: str = None, q: str = None, gq: str = None, ctx: str = None, **kwargs) -> int:
@@ -149,11 +159,7 @@ class Entities:
             params["q"] = q
         if gq:
             params["geoQ"] = gq
-        headers = {
-            "Accept": "application/json",
-        }  # overrides session headers
-        if ctx is not None:
-            headers["Link"] = f'<{ctx}>; rel="{JSONLD_CONTEXT}"; type="application/ld+json"'
+        headers = _with_context(HEADERS_COUNT, ctx)
         r: Response = await self._client.client.get(
             self.url,
             headers=headers,
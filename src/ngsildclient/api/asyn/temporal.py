@@ -20,11 +20,14 @@ import logging
 if TYPE_CHECKING:
     from .client import AsyncClient
 
-from ..constants import JSONLD_CONTEXT, AggrMethod
+from ..constants import AggrMethod
 from ...utils.urn import Urn
 from ..helper.temporal import TemporalQuery
 from ...model.entity import Entity
+from ...model.utils import decode_json
 from ..temporal import _addopt, Pagination, TemporalResult, troes_to_dataframe
+from ..entities import _with_context
+from .entities import HEADERS_GET
 from ngsildclient.utils import is_pandas_installed
 
 logger = logging.getLogger(__name__)
@@ -35,6 +38,7 @@ class Temporal:
         self._client = client
         self._session = client.client
         self.url = url
+        self._url_slash = f"{url}/"
 
     async def _get(
         self,
@@ -49,12 +53,9 @@ class Temporal:
     ) -> TemporalResult:
         eid = eid.id if isinstance(eid, Entity) else Urn.prefix(eid)
         params = {}
-        headers = {"Accept": "application/ld+json"}
-        if ctx is not None:
-            headers["Link"] = f'<{ctx}>; rel="{JSONLD_CONTEXT}"; type="application/ld+json"'
+        headers = _with_context(HEADERS_GET, ctx)
         if count:
             _addopt(params, "count")
-        params = {}
         if attrs:
             params["attrs"] = ",".join(attrs)
         if lastn > 0:
@@ -65,9 +66,9 @@ class Temporal:
             params["pageAnchor"] = pageanchor
         if not verbose:
             _addopt(params, "temporalValues")
-        r: Response = await self._session.get(f"{self.url}/{eid}", headers=headers, params=params)
+        r: Response = await self._session.get(self._url_slash + eid, headers=headers, params=params)
         self._client.raise_for_status(r)
-        return TemporalResult(r.json(), Pagination.from_headers(r.headers))
+        return TemporalResult(decode_json(r.content), Pagination.from_headers(r.headers))
 
     #  equivalent to get_all()
     async def get(
@@ -132,16 +133,14 @@ class Temporal:
             params["pageSize"] = pagesize
         if pageanchor is not None:
             params["pageAnchor"] = pageanchor
-        headers = {"Accept": "application/ld+json"}
-        if ctx is not None:
-            headers["Link"] = f'<{ctx}>; rel="{JSONLD_CONTEXT}"; type="application/ld+json"'
+        headers = _with_context(HEADERS_GET, ctx)
         r: Response = await self._session.get(
             self.url,
             headers=headers,
             params=params,
         )
         self._client.raise_for_status(r)
-        return TemporalResult(r.json(), Pagination.from_headers(r.headers))
+        return TemporalResult(decode_json(r.content), Pagination.from_headers(r.headers))
 
     async def query_head(
         self,
@@ -229,6 +228,8 @@ class Temporal:
                 verbose = False  # force simplified representation
             else:
                 raise ValueError("Cannot export to dataframe : pandas not installed.")
+        if tq is None:
+            tq = TemporalQuery().before()  # evaluated once, so that all pages share the same time frame
         r: TemporalResult = await self._query(eid, type, attrs, q, gq, ctx, verbose, tq, pagesize=pagesize)
         troes: List[dict] = r.result
         while r.pagination.next_url is not None:
@@ -251,6 +252,8 @@ class Temporal:
         tq: TemporalQuery = None,
         pagesize: int = 0,
     ) -> Awaitable[Generator[List[dict], None, None]]:
+        if tq is None:
+            tq = TemporalQuery().before()  # evaluated once, so that all pages share the same time frame
         r: TemporalResult = await self._query(eid, type, attrs, q, gq, ctx, verbose, tq, pagesize=pagesize)
         troes = r.result
         for troe in troes:
@@ -320,13 +323,11 @@ class Temporal:
             params["pageAnchor"] = pageanchor
         params["aggrMethods"] = ",".join([m.value for m in methods])
         params["aggrPeriodDuration"] = duration_isoformat(period)
-        headers = {"Accept": "application/ld+json"}
-        if ctx is not None:
-            headers["Link"] = f'<{ctx}>; rel="{JSONLD_CONTEXT}"; type="application/ld+json"'
+        headers = _with_context(HEADERS_GET, ctx)
         r: Response = await self._session.get(
             self.url,
             headers=headers,
             params=params,
         )
         self._client.raise_for_status(r)
-        return TemporalResult(r.json(), Pagination.from_headers(r.headers))
+        return TemporalResult(decode_json(r.content), Pagination.from_headers(r.headers))
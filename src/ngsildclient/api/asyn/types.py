@@ -18,6 +18,7 @@ if TYPE_CHECKING:
     from .client import AsyncClient
 
 from ..exceptions import rfc7807_error_handle_async
+from ...model.utils import decode_json
 
 
 logger = logging.getLogger(__name__)
@@ -30,5 +31,5 @@ class Types:
 
     @rfc7807_error_handle_async
     async def list(self) -> Optional[dict]:
-        r = await self._client.client.get(f"{self.url}")
-        return r.json()["typeList"]
+        r = await self._client.client.get(self.url)
+        return decode_json(r.content)["typeList"]
@@ -11,23 +11,23 @@
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, List, Literal, Sequence
+from typing import TYPE_CHECKING, Callable, List, Literal, Sequence
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 
 if TYPE_CHECKING:
     from ngsildclient.model.constants import EntityOrId
 
 import logging
-import json
 
 if TYPE_CHECKING:
     from .client import Client
 
-from .constants import BATCHSIZE
+from .constants import BATCHSIZE, CONCURRENCY
 from ngsildclient.utils.console import Console, MsgLvl
 from .exceptions import NgsiApiError, rfc7807_error_handle
 from ..model.entity import Entity
-from ngsildclient.model.utils import NgsiEncoder
+from ..model.utils import decode_json
 
 BatchOp = Literal["create", "upsert", "update", "delete"]
 
@@ -90,99 +90,123 @@ class Batch:
         self._client = client
         self._session = client.session
         self.url = url
+        self._url_create = f"{url}/create/"
+        self._url_upsert = f"{url}/upsert/"
+        self._url_update = f"{url}/update/"
+        self._url_delete = f"{url}/delete/"
         self.console = Console()
 
+    def _run(self, op: BatchOp, fn: Callable, entities: Sequence, batchsize: int, concurrency: int) -> BatchResult:
+        """Split entities into batches and send them concurrently, gathering the results in order."""
+        r = BatchResult(op)
+        batches = [entities[i : i + batchsize] for i in range(0, len(entities), batchsize)]
+        if len(batches) <= 1 or concurrency <= 1:
+            results = map(fn, batches)
+        else:
+            with ThreadPoolExecutor(max_workers=min(concurrency, len(batches))) as executor:
+                results = list(executor.map(fn, batches))
+        for result in results:
+            r += result
+        return r
+
     @rfc7807_error_handle
     def _create(self, entities: Sequence[Entity]) -> BatchResult:
-        r = self._session.post(f"{self.url}/create/", data=json.dumps([e for e in entities], cls=NgsiEncoder))
+        r = self._client._post(self._url_create, entities)
         self._client.raise_for_status(r)
         if r.status_code == 201:
-            success, errors = r.json(), []
+            success, errors = decode_json(r.content), []
         elif r.status_code == 207:
-            content = r.json()
+            content = decode_json(r.content)
             success, errors = content["success"], content["errors"]
         else:
             raise NgsiApiError("Batch Create : Unkown HTTP response code {}", r.status_code)
         return BatchResult("create", success, errors)
 
     @rfc7807_error_handle
-    def create(self, entities: Sequence[Entity], *, batchsize: int = BATCHSIZE) -> BatchResult:
-        r = BatchResult("create")
-        for i in range(0, len(entities), batchsize):
-            r += self._create(entities[i : i + batchsize])
+    def create(
+        self, entities: Sequence[Entity], *, batchsize: int = BATCHSIZE, concurrency: int = CONCURRENCY
+    ) -> BatchResult:
+        r = self._run("create", self._create, entities, batchsize, concurrency)
         self.console.message(f"Entities created : {r.n_ok}/{r.n_tot} [{r.ratio:.2f}]", lvl=r.level)
         return r
 
     @rfc7807_error_handle
     def _upsert(self, entities: Sequence[Entity], opt: Literal["replace", "update"] = "replace") -> BatchResult:
         params = {"options": opt} if opt else {}
-        r = self._session.post(
-            f"{self.url}/upsert/", data=json.dumps([e for e in entities], cls=NgsiEncoder), params=params
-        )
+        r = self._client._post(self._url_upsert, entities, params=params)
         self._client.raise_for_status(r)
         if r.status_code == 201:
-            success, errors = r.json(), []
+            success, errors = decode_json(r.content), []
         elif r.status_code == 204:
             success, errors = [e.id for e in entities], []
         elif r.status_code == 207:
-            content = r.json()
+            content = decode_json(r.content)
             success, errors = content["success"], content["errors"]
         else:
             raise NgsiApiError("Batch Upsert : Unkown HTTP response code {}", r.status_code)
         return BatchResult("upsert", success, errors)
 
     @rfc7807_error_handle
-    def upsert(self, entities: Sequence[Entity], *, update: bool = False, batchsize: int = BATCHSIZE) -> BatchResult:
+    def upsert(
+        self,
+        entities: Sequence[Entity],
+        *,
+        update: bool = False,
+        batchsize: int = BATCHSIZE,
+        concurrency: int = CONCURRENCY,
+    ) -> BatchResult:
         # default mode (without any option) is "replace", anyway always force the option
         opt = "update" if update else "replace"
-        r = BatchResult("upsert")
-        for i in range(0, len(entities), batchsize):
-            r += self._upsert(entities[i : i + batchsize], opt)
+        r = self._run("upsert", lambda batch: self._upsert(batch, opt), entities, batchsize, concurrency)
         self.console.message(f"Entities upserted : {r.n_ok}/{r.n_tot} [{r.ratio:.2f}]", lvl=r.level)
         return r
 
     @rfc7807_error_handle
     def _update(self, entities: Sequence[Entity], opt: Literal["noOverwrite"] = None) -> BatchResult:
         params = {"options": opt} if opt else {}
-        r = self._session.post(
-            f"{self.url}/update/", data=json.dumps([e for e in entities], cls=NgsiEncoder), params=params
-        )
+        r = self._client._post(self._url_update, entities, params=params)
         self._client.raise_for_status(r)
         if r.status_code == 204:
             success, errors = [e.id for e in entities], []
         elif r.status_code == 207:
-            content = r.json()
+            content = decode_json(r.content)
             success, errors = content["success"], content["errors"]
         else:
             raise NgsiApiError("Batch Update : Unkown HTTP response code {}", r.status_code)
         return BatchResult("update", success, errors)
 
     @rfc7807_error_handle
-    def update(self, entities: Sequence[Entity], *, overwrite: bool = True, batchsize: int = BATCHSIZE) -> BatchResult:
+    def update(
+        self,
+        entities: Sequence[Entity],
+        *,
+        overwrite: bool = True,
+        batchsize: int = BATCHSIZE,
+        concurrency: int = CONCURRENCY,
+    ) -> BatchResult:
         opt = "noOverwrite" if not overwrite else None
-        r = BatchResult("update")
-        for i in range(0, len(entities), batchsize):
-            r += self._update(entities[i : i + batchsize], opt)
+        r = self._run("update", lambda batch: self._update(batch, opt), entities, batchsize, concurrency)
         self.console.message(f"Entities updated : {r.n_ok}/{r.n_tot} [{r.ratio:.2f}]", lvl=r.level)
         return r
 
     @rfc7807_error_handle
     def _delete(self, entities: Sequence[EntityOrId]) -> BatchResult:
-        r = self._session.post(f"{self.url}/delete/", json=[e.id if isinstance(e, Entity) else e for e in entities])
+        ids = [e.id if isinstance(e, Entity) else e for e in entities]
+        r = self._client._post(self._url_delete, ids)
         self._client.raise_for_status(r)
         if r.status_code == 204:
-            success, errors = [e.id for e in entities], []
+            success, errors = ids, []
         elif r.status_code == 207:
-            content = r.json()
+            content = decode_json(r.content)
             success, errors = content["success"], content["errors"]
         else:
             raise NgsiApiError("Batch Delete : Unkown HTTP response code {}", r.status_code)
         return BatchResult("delete", success, errors)
 
     @rfc7807_error_handle
-    def delete(self, entities: Sequence[EntityOrId], *, batchsize: int = BATCHSIZE) -> BatchResult:
-        r = BatchResult("delete")
-        for i in range(0, len(entities), batchsize):
-            r += self._delete(entities[i : i + batchsize])
+    def delete(
+        self, entities: Sequence[EntityOrId], *, batchsize: int = BATCHSIZE, concurrency: int = CONCURRENCY
+    ) -> BatchResult:
+        r = self._run("delete", self._delete, entities, batchsize, concurrency)
         self.console.message(f"Entities deleted : {r.n_ok}/{r.n_tot} [{r.ratio:.2f}]", lvl=r.level)
         return r
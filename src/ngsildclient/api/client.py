@@ -11,20 +11,33 @@
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Optional, Tuple, Generator, List, Union, Callable, Set
+from typing import TYPE_CHECKING, Optional, Tuple, Generator, List, Dict, Union, Callable, Sequence
 
 if TYPE_CHECKING:
     from ngsildclient.model.constants import EntityOrId
 
+import gzip
+import json
 import logging
+import os
+import sys
+import tempfile
+import time
 import requests
+from requests.adapters import HTTPAdapter
 from requests.auth import AuthBase
+from requests.utils import default_headers
+from urllib3.util.retry import Retry
 from dataclasses import dataclass
+from functools import cached_property
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import chain
 from math import ceil
+from pathlib import Path
 import networkx as nx
 
 from ngsildclient import __version__ as __version__
-from ..utils import is_interactive
+from ..utils import is_interactive, prefetch, slotted
 from ..utils.urn import Urn
 from ngsildclient import Entity
 from .constants import *
@@ -39,13 +52,57 @@ from .follow import LinkFollower
 from .exceptions import *
 from ngsildclient.settings import globalsettings
 from ngsildclient.utils.console import Console, MsgLvl
+from ngsildclient.model.utils import encode_json, decode_json
 
 logger = logging.getLogger(__name__)
 
 """This module contains the definition of the Client class.
 """
 
+PROBE_PARAMS = {"type": "None", "limit": 0, "count": "true"}
 
+# the encodings urllib3 can decode here (gzip, deflate and br if a brotli package is installed)
+ACCEPT_ENCODING = default_headers()["Accept-Encoding"]
+
+# successful connection checks shared by all Client instances : (broker url, tenant) => time of the check
+_probe_cache: dict[Tuple[str, Optional[str]], float] = {}
+
+# guessed vendors shared by all Client instances : broker url => ((vendor, version), expiry)
+_vendor_cache: dict[str, Tuple[Tuple[Vendor, Version], float]] = {}
+
+# guessed vendors persisted across processes : broker url => {"vendor", "version", "expiry" (epoch)}
+VENDOR_CACHE_FILE = Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")) / "ngsildclient" / "broker.json"
+
+
+def _read_vendor_file() -> dict:
+    try:
+        with open(VENDOR_CACHE_FILE, "r") as fp:
+            return json.load(fp)
+    except (OSError, ValueError):
+        return {}
+
+
+def _load_vendor(url: str) -> Optional[Tuple[Vendor, Version]]:
+    entry = _read_vendor_file().get(url)
+    if entry is None or entry["expiry"] < time.time():
+        return None
+    return Vendor(entry["vendor"]), entry["version"]
+
+
+def _save_vendor(url: str, broker: Tuple[Vendor, Version]):
+    vendor, version = broker
+    content = _read_vendor_file()
+    content[url] = {"vendor": vendor.value, "version": version, "expiry": time.time() + VENDOR_DISK_CACHE_TTL}
+    try:
+        VENDOR_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile("w", dir=VENDOR_CACHE_FILE.parent, delete=False) as fp:
+            json.dump(content, fp)
+        os.replace(fp.name, VENDOR_CACHE_FILE)  # atomic : concurrent readers never see a partial file
+    except OSError as e:
+        logger.warning(f"Cannot persist the broker vendor : {e}")
+
+
+@slotted
 @dataclass
 class Broker:
     """Represent a NGSI-LD Context Broker."""
@@ -87,6 +144,8 @@ class Client:
     >>>     client.upsert(farm)
     """
 
+    version: str = __version__
+
     def __init__(
         self,
         hostname: str = "localhost",
@@ -98,9 +157,13 @@ class Client:
         tenant_autocreate: bool = True,
         overwrite: bool = False,
         ignore_errors: bool = False,
-        proxy: str = None,
+        proxy: Union[str, Dict[str, str]] = None,
         custom_auth: AuthBase = None,
         verbose: bool = True,
+        pool_size: int = POOL_SIZE,
+        lazy: bool = False,
+        compress: bool = False,
+        persist_vendor: bool = False,
     ):
         """Create a Client instance to interact with the Context Broker.
 
@@ -128,8 +191,19 @@ class Client:
             if set create() will behave like upsert(), by default False
         ignore_errors : bool, optional
             if set tests the connection at init time and raises an exception if failed, by default False
-        proxy : str, optional
+        proxy : Union[str, Dict[str, str]], optional
             proxies all requests to the provided proxy string (for debugging purpose), by default None
+            A dict mapping schemes to proxies (as expected by requests) is also accepted.
+        pool_size : int, optional
+            the maximum number of connections kept alive per host, by default POOL_SIZE
+        lazy : bool, optional
+            if set skips the connection check (and tenant autocreation) at init time, call connect() to do it later,
+            by default False
+        compress : bool, optional
+            if set gzip-compresses large payloads sent to the broker (that must support it), by default False
+        persist_vendor : bool, optional
+            if set the guessed vendor is also cached on disk (in VENDOR_CACHE_FILE) for VENDOR_DISK_CACHE_TTL seconds,
+            sparing the vendor probes to the next processes connecting to the same broker, by default False
 
         See Also
         --------
@@ -151,29 +225,49 @@ class Client:
         self.overwrite = overwrite
         self.ignore_errors = ignore_errors
         self.proxy = proxy
+        self.compress = compress
+        self.persist_vendor = persist_vendor
         self.url_temporal = f"{self.scheme}://{hostname}:{port_temporal}"
+        self._url_entities = f"{self.url}/{ENDPOINT_ENTITIES}"
+        self._url_version = f"{self.url}/{ENDPOINT_STATUS}"
+        self._url_actuator_info = f"{self.url}/actuator/info"
 
         self.session = requests.Session()
+        # POST and PATCH are never retried as they may have been processed by the broker
+        retry = Retry(total=MAX_RETRIES, backoff_factor=0.2, status_forcelist=RETRY_STATUS, raise_on_status=False)
+        adapter = HTTPAdapter(pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
         if custom_auth:
             self.session.auth = custom_auth
         self.session.headers = {
             "User-Agent": self.useragent,
             "Accept": "application/ld+json",
+            "Accept-Encoding": ACCEPT_ENCODING,  # dropped along with the requests default headers otherwise
             "Content-Type": "application/ld+json",
         }
         if tenant is not None:
             self.session.headers["NGSILD-Tenant"] = tenant
         if proxy:
-            self.session.proxies = {proxy}
+            self.session.proxies = proxy if isinstance(proxy, dict) else {"http": proxy, "https": proxy}
+
+        # the probes expect plain JSON : give them their own session rather than overriding the session headers
+        # on each request, with no retries so that a refused connection or a timeout is reported at once
+        self._probe_session = requests.Session()
+        probe_adapter = HTTPAdapter(max_retries=0)
+        self._probe_session.mount("http://", probe_adapter)
+        self._probe_session.mount("https://", probe_adapter)
+        self._probe_session.auth = self.session.auth
+        self._probe_session.headers = {"User-Agent": self.useragent, "Accept": "application/json"}
+        if tenant is not None:
+            self._probe_session.headers["NGSILD-Tenant"] = tenant
+        self._probe_session.proxies = self.session.proxies
+        self._probe_head = True  # check the connection with HEAD until the broker rejects it
 
         self.verbose = verbose
         self.console = Console(verbose)
 
-        self._entities = Entities(self, f"{self.url}/{ENDPOINT_ENTITIES}", f"{self.url}/{ENDPOINT_ALT_QUERY_ENTITIES}")
-        self._batch = Batch(self, f"{self.url}/{ENDPOINT_BATCH}")
-        self._types = Types(self, f"{self.url}/{ENDPOINT_TYPES}")
-        self._contexts = Contexts(self, f"{self.url}/{ENDPOINT_CONTEXTS}")
-        self._subscriptions = Subscriptions(self, f"{self.url}/{ENDPOINT_SUBSCRIPTIONS}")
+        # entities, batch, types, contexts and subscriptions wrappers are built on first use
 
         if port_temporal == port:  # temporal endpoint mounted at /ngsi-ld/v1
             self._temporal = Temporal(
@@ -185,16 +279,48 @@ class Client:
             self._temporal = Temporal(
                 self, f"{self.url_temporal}/{ENDPOINT_TEMPORAL}", f"{self.url_temporal}/{ENDPOINT_ALT_QUERY_TEMPORAL}"
             )
-        self._alt = Alt(self)
+        self.temporal = self._temporal
+        self._alt = self.alt = Alt(self)
         self.broker = Broker(Vendor.UNKNOWN, "N/A")
 
-        # get status and retrieve Context Broker information
-        status = self.is_connected(raise_for_disconnected=True)
+        if not lazy:
+            self.connect()
+
+    def connect(self) -> bool:
+        """Check the connection to the Context Broker and retrieve Context Broker information.
+
+        Done at init time unless the client has been created with lazy set.
+        A successful check is cached for PROBE_CACHE_TTL seconds and shared among clients of the same broker and tenant.
+
+        Returns
+        -------
+        bool
+            True if the Context Broker replies
+
+        Raises
+        ------
+        NgsiNotConnectedError
+        """
+        status = self._probe_cached(PROBE_CACHE_TTL) or self.is_connected(raise_for_disconnected=True)
         if status:
-            self.broker = Broker(*self.guess_vendor())
+            if self.port_temporal != self.port:  # the connection check did not reach the temporal endpoint
+                self._temporal.warmup()
+            if self.verbose:  # the vendor is only needed for the welcome message
+                self.broker = Broker(*self.guess_vendor())
             self.console.print(self._welcome_message())
         else:
             self.console.print(self._fail_message())
+        return status
+
+    @staticmethod
+    def invalidate_probe_cache():
+        """Forget the connection checks and the guessed vendors cached by all clients."""
+        _probe_cache.clear()
+        _vendor_cache.clear()
+
+    def _probe_cached(self, ttl: float) -> bool:
+        checked = _probe_cache.get((self.url, self.tenant))
+        return checked is not None and time.monotonic() - checked < ttl
 
     def raise_for_status(self, r: Response):
         """Raises an exception depending on the API response.
@@ -211,6 +337,8 @@ class Client:
         """Test if connection to Context Broker is established.
 
         Send a valid test request to the Context Broker and expects a result.
+        The request is sent with HEAD, falling back to GET for brokers that do not support it.
+        Unless raise_for_disconnected is set, a successful check younger than HEALTH_CACHE_TTL seconds is reused.
 
         Parameters
         ----------
@@ -226,17 +354,14 @@ class Client:
         ------
         NgsiNotConnectedError
         """
-        url = f"{self.url}/{ENDPOINT_ENTITIES}"
-        params = {"type": "None", "limit": 0, "count": "true"}
+        if not raise_for_disconnected and self._probe_cached(HEALTH_CACHE_TTL):
+            return True
         try:
-            r = self.session.get(
-                url,
-                headers={
-                    "Accept": "application/json",
-                    "Content-Type": None,
-                },  # overrides session headers
-                params=params,
-            )
+            if self._probe_head:
+                r = self._probe_session.head(self._url_entities, params=PROBE_PARAMS)
+                self._probe_head = r.status_code not in HEAD_NOT_SUPPORTED
+            if not self._probe_head:
+                r = self._probe_session.get(self._url_entities, params=PROBE_PARAMS)
 
             if not r.ok and self.tenant and self.tenant_autocreate:
                 r = self.create_tenant(self.tenant)
@@ -252,47 +377,84 @@ class Client:
             else:
                 logger.error(e)
                 return False
+        _probe_cache[(self.url, self.tenant)] = time.monotonic()
         return True
 
-    @property
-    def version(self) -> str:
-        return __version__
-
-    @property
-    def entities(self):
-        return self._entities
-
-    @property
-    def batch(self):
-        return self._batch
-
-    @property
-    def types(self):
-        return self._types
-
-    @property
-    def contexts(self):
-        return self._contexts
+    def _post(self, url: str, payload, **kwargs) -> Response:
+        """Send a JSON payload, gzip-compressed if compression is enabled and the payload is large enough.
 
-    @property
-    def subscriptions(self):
-        return self._subscriptions
-
-    @property
-    def temporal(self):
-        return self._temporal
-
-    @property
-    def alt(self):
-        return self._alt
+        If the broker rejects the compressed payload, compression is disabled and the payload is sent again.
+        """
+        body = encode_json(payload)
+        if self.compress and len(body) >= GZIP_MIN_SIZE:
+            headers = {**kwargs.get("headers", {}), "Content-Encoding": "gzip"}
+            r = self.session.post(url, data=gzip.compress(body, compresslevel=6), **{**kwargs, "headers": headers})
+            if r.status_code != 415:  # Unsupported Media Type
+                return r
+            logger.warning("Context Broker does not support compressed payloads. Disable compression.")
+            self.compress = False
+        return self.session.post(url, data=body, **kwargs)
+
+    # the public wrappers are aliases of the underscored ones, which the client methods use
+    # a cached_property cannot be bound to two names : the builders set both, and the public name is only
+    # looked up through __getattr__ when accessed before the wrapper is built
+    _LAZY_WRAPPERS = frozenset(("entities", "batch", "types", "contexts", "subscriptions"))
+    entities: Entities
+    batch: Batch
+    types: Types
+    contexts: Contexts
+    subscriptions: Subscriptions
+
+    def __getattr__(self, name: str):
+        if name in Client._LAZY_WRAPPERS:
+            return getattr(self, f"_{name}")
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+    @cached_property
+    def _entities(self) -> Entities:
+        self.entities = Entities(self, self._url_entities, f"{self.url}/{ENDPOINT_ALT_QUERY_ENTITIES}")
+        return self.entities
+
+    @cached_property
+    def _batch(self) -> Batch:
+        self.batch = Batch(self, f"{self.url}/{ENDPOINT_BATCH}")
+        return self.batch
+
+    @cached_property
+    def _types(self) -> Types:
+        self.types = Types(self, f"{self.url}/{ENDPOINT_TYPES}")
+        return self.types
+
+    @cached_property
+    def _contexts(self) -> Contexts:
+        self.contexts = Contexts(self, f"{self.url}/{ENDPOINT_CONTEXTS}")
+        return self.contexts
+
+    @cached_property
+    def _subscriptions(self) -> Subscriptions:
+        self.subscriptions = Subscriptions(self, f"{self.url}/{ENDPOINT_SUBSCRIPTIONS}")
+        return self.subscriptions
 
     def close(self):
         """Terminates the client.
 
-        Closes the underlying Requests.Session.
+        Closes the underlying Requests sessions.
         """
+        self._probe_session.close()
         self.session.close()
 
+    def _single_or_batch(self, entities: tuple, single_fn: Callable, batch_fn: Callable, **kwargs):
+        """Dispatch the facade arguments to the single entity method or to the batch method.
+
+        Entities are either a single Entity (or entity id), or an iterable of entities, or comma-separated entities.
+        """
+        if len(entities) == 1:
+            entity = entities[0]
+            if isinstance(entity, (Entity, str)):
+                return single_fn(entity)
+            entities = entity if isinstance(entity, Sequence) else list(entity)  # ie. a generator
+        return batch_fn(entities, **kwargs)
+
     def create(self, *entities) -> Union[bool, BatchResult]:
         """Create one or many entities.
 
@@ -309,13 +471,7 @@ class Client:
         Entity
             The entities successfully upserted
         """
-        if len(entities) == 1:
-            if isinstance(entities[0], Entity):
-                entity = entities[0]
-                return self.entities.create(entity)
-            else:
-                entities = entities[0]
-        return self.batch.create(entities)
+        return self._single_or_batch(entities, self.entities.create, self.batch.create)
 
     def get(
         self,
@@ -361,13 +517,7 @@ class Client:
         Entity
             The entities successfully upserted
         """
-        if len(entities) == 1:
-            if isinstance(entities[0], Entity):
-                entity = entities[0]
-                return self.entities.delete(entity)
-            else:
-                entities = entities[0]
-        return self.batch.delete(entities)
+        return self._single_or_batch(entities, self.entities.delete, self.batch.delete)
 
     def delete_from_file(self, filename: str) -> Union[bool, BatchResult]:
         """Delete in the broker all entities present in the JSON file.
@@ -419,24 +569,26 @@ class Client:
         Entity
             The entities successfully upserted
         """
-        if len(entities) == 1:
-            if isinstance(entities[0], Entity):
-                entity = entities[0]
-                return self.entities.upsert(entity)
-            else:
-                entities = entities[0]
-        return self.batch.upsert(entities, update=update)
+        return self._single_or_batch(entities, self.entities.upsert, self.batch.upsert, update=update)
 
-    def bulk_import(self, filename: str) -> Union[bool, dict]:
+    def bulk_import(self, filename: str, *, batchsize: int = BATCHSIZE) -> BatchResult:
         """Upsert all entities from a JSON file.
 
+        Entities are read and sent batch after batch, the next batch being read while the current one is upserted.
+        The whole file is never held in memory as a list of entities.
+
         Parameters
         ----------
         filename : str
-            Points to the JSON input file that contains entities.
+            Points to the JSON input file that contains an array of entities.
+        batchsize : int
+            The maximum number of entities sent per batch operation
         """
-        entities = Entity.load(filename)
-        return self.upsert(entities)
+        r = BatchResult("upsert")
+        for batch in prefetch(Entity.load_batches(filename, batchsize)):
+            r += self.batch._upsert(batch)
+        self.batch.console.message(f"Entities upserted : {r.n_ok}/{r.n_tot} [{r.ratio:.2f}]", lvl=r.level)
+        return r
 
     def update(self, *entities, overwrite=True) -> Union[bool, BatchResult]:
         """Upsert one or many entities.
@@ -459,13 +611,7 @@ class Client:
         Entity
             The entities successfully updated
         """
-        if len(entities) == 1:
-            if isinstance(entities[0], Entity):
-                entity = entities[0]
-                return self.entities.update(entity)
-            else:
-                entities = entities[0]
-        return self.batch.update(entities, overwrite=overwrite)
+        return self._single_or_batch(entities, self.entities.update, self.batch.update, overwrite=overwrite)
 
     def query_head(self, type: str = None, q: str = None, gq: str = None, ctx: str = None, n: int = 5) -> List[Entity]:
         """Retrieve entities given its type and/or query string.
@@ -509,10 +655,13 @@ class Client:
         ctx: str = None,
         limit: int = PAGINATION_LIMIT_MAX,
         max: int = 1_000_000,
+        concurrency: int = CONCURRENCY,
+        asdict: bool = False,
     ) -> List[Entity]:
         """Retrieve entities given its type and/or query string.
 
         Retrieve all entities by sending as many requests as needed, using pagination.
+        Pages are requested concurrently and gathered in order.
         Assume data hold in memory. Should not be an issue except for very large datasets.
 
         Parameters
@@ -527,6 +676,10 @@ class Client:
             The context
         limit: int
             The number of entities retrieved in each request
+        concurrency: int
+            The maximum number of pages requested simultaneously
+        asdict : bool, optional
+            If set (instead of Entity instances) returns the raw entities (Python dicts), by default False
 
         Returns
         -------
@@ -542,12 +695,21 @@ class Client:
         >>>     client.query(type="AgriFarm", q='contactPoint[email]=="wheatfarm@email.com"') # match type and query
         """
 
-        entities: list[Entity] = []
-        count = self.entities.count(type, q, gq, ctx=ctx)
+        params = self.entities._query_params(type, q, gq, limit)
+        first, count = self.entities._query_page_with_count(params, ctx, asdict)  # no extra roundtrip to count
         if count > max:
             raise NgsiClientTooManyResultsError(f"{count} results exceed maximum {max}")
-        for page in range(ceil(count / limit)):
-            entities.extend(self.entities._query(type, q, gq, ctx, limit, page * limit))
+        if count <= limit:  # a single page
+            return first
+        entities: list[Entity] = [None] * count  # preallocated, pages are copied in place
+        entities[: len(first)] = first
+        n = len(first)  # the broker may return more or less entities than counted if modified meanwhile
+        offsets = range(limit, count, limit)
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            for page in executor.map(lambda offset: self.entities._query_page(params, ctx, offset, asdict), offsets):
+                entities[n : n + len(page)] = page
+                n += len(page)
+        del entities[n:]
         return entities
 
     def query_generator(
@@ -558,10 +720,12 @@ class Client:
         ctx: str = None,
         limit: int = PAGINATION_LIMIT_MAX,
         batch: bool = False,
+        asdict: bool = False,
     ) -> Generator[Entity, None, None]:
         """Retrieve (as a generator) entities given its type and/or query string.
 
         By returning a generator it allows to process entities on the fly without any risk of exhausting memory.
+        The next page is retrieved in the background while the entities of the current page are processed.
 
         Parameters
         ----------
@@ -575,6 +739,10 @@ class Client:
             The context
         limit: int
             The number of entities retrieved in each request
+        batch: bool
+            If set yields pages (lists of entities) instead of entities, by default False
+        asdict : bool, optional
+            If set (instead of Entity instances) yields the raw entities (Python dicts), by default False
 
         Returns
         -------
@@ -587,12 +755,14 @@ class Client:
         >>>     for entity in client.query_handle(type="AgriFarm"):
                     print(entity)
         """
-        count = self.entities.count(type, q)
-        for page in range(ceil(count / limit)):
+        params = self.entities._query_params(type, q, gq, limit)
+        first, count = self.entities._query_page_with_count(params, ctx, asdict)
+        pages = (self.entities._query_page(params, ctx, offset, asdict) for offset in range(limit, count, limit))
+        for page in prefetch(chain([first], pages)):
             if batch:
-                yield self.entities._query(type, q, gq, ctx, limit, page * limit)
+                yield page
             else:
-                yield from self.entities._query(type, q, gq, ctx, limit, page * limit)
+                yield from page
 
     def query_handle(
         self,
@@ -658,9 +828,12 @@ class Client:
         """
         return self.entities.count(type, q, gq)
 
-    def delete_where(self, type: str = None, q: str = None, gq: str = None):
+    def delete_where(self, type: str = None, q: str = None, gq: str = None) -> BatchResult:
         """Batch delete entities matching type and/or query string.
 
+        Entities are retrieved and deleted page by page, the next page being retrieved while deleting the current one.
+        Matching entities are never held in memory all at once.
+
         Parameters
         ----------
         etype : str
@@ -670,14 +843,30 @@ class Client:
         gq: str
             The geoquery string (NGSI-LD Geoquery Language)
 
+        Returns
+        -------
+        BatchResult
+            The outcome of all the batch delete operations
+
         Example
         -------
         >>> with Client() as client:
         >>>     client.delete_where(type="AgriFarm", query='contactPoint[email]=="wheatfarm@email.com"') # match type and query
         """
-        g = self.query_generator(type, q, gq, batch=True)
-        for batch in g:
-            self.batch.delete(batch)
+        params = self.entities._query_params(type, q, gq, PAGINATION_LIMIT_MAX)
+        first, count = self.entities._query_ids_page_with_count(params)  # only ids are needed to delete
+        # walk the pages backwards : deleting a page does not shift the offsets of the pages not yet fetched
+        # the first page, fetched along with the count, stays valid and is deleted last
+        offsets = range((ceil(count / PAGINATION_LIMIT_MAX) - 1) * PAGINATION_LIMIT_MAX, 0, -PAGINATION_LIMIT_MAX)
+        pages = (self.entities._query_ids_page(params, offset=offset) for offset in offsets)
+        r = BatchResult("delete")
+        for batch in prefetch(pages):  # fetch the next page while deleting the current one
+            r += self.batch._delete(batch)
+        if first:
+            r += self.batch._delete(first)
+        if r.n_tot:
+            self.batch.console.message(f"Entities deleted : {r.n_ok}/{r.n_tot} [{r.ratio:.2f}]", lvl=r.level)
+        return r
 
     def drop(self, *types: str) -> None:
         """Batch delete entities matching the given type.
@@ -695,16 +884,24 @@ class Client:
         for t in types:
             self.delete_where(type=t)
 
-    def purge(self) -> None:
+    def purge(self, concurrency: int = CONCURRENCY) -> None:
         """Batch delete all entities.
 
+        Entity types are processed concurrently.
+
+        Parameters
+        ----------
+        concurrency: int
+            The maximum number of entity types processed simultaneously
+
         Example
         -------
         >>> with Client() as client:
         >>>     client.purge()
         """
-        for type in self.types.list():
-            self.drop(type)
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            # consume the results to propagate exceptions
+            list(executor.map(lambda type: self.delete_where(type=type), self.types.list()))
 
     def flush_all(self) -> None:
         """Batch delete all entities and remove all contexts.
@@ -714,7 +911,7 @@ class Client:
         >>> with Client() as client:
         >>>     client.purge()
         """
-        self.purge(type)
+        self.purge()
         self.contexts.cleanup()
 
     def create_tenant(self, tenant: str) -> Response:
@@ -723,14 +920,15 @@ class Client:
             "type": "__NGSILD-Tenant__",
             "@context": ["https://uri.etsi.org/ngsi-ld/v1/ngsi-ld-core-context.jsonld"],
         }
-        return self.session.post(
-            f"{self.url}/{ENDPOINT_BATCH}/upsert/", json=[payload], headers={"NGSILD-Tenant": tenant}
-        )
+        return self._post(self._batch._url_upsert, [payload], headers={"NGSILD-Tenant": tenant})
 
     def guess_vendor(self) -> tuple[Vendor, Version]:
         """Try to guess the Context Broker vendor.
 
-        According to its own API, by using version or status endpoint.
+        According to its own API, by using version or status endpoint. Both endpoints are probed concurrently.
+        An endpoint not answering within VENDOR_PROBE_TIMEOUT seconds is considered absent.
+        Once identified, the vendor is cached for VENDOR_CACHE_TTL seconds and shared among clients of the same broker.
+        If persist_vendor is set, it is also cached on disk and shared with other processes.
 
         Returns
         -------
@@ -743,11 +941,23 @@ class Client:
         >>>     print(client.guess_vendor())
         (<Vendor.ORIONLD: 'Orion-LD'>, 'post-v0.8.1')
         """
-        if broker := self._broker_version_orionld():
-            return broker
-        if broker := self._broker_version_java_spring():
+        cached = _vendor_cache.get(self.url)
+        if cached is not None and cached[1] > time.monotonic():
+            return cached[0]
+        if self.persist_vendor and (broker := _load_vendor(self.url)) is not None:
+            _vendor_cache[self.url] = (broker, time.monotonic() + VENDOR_CACHE_TTL)
             return broker
-        return Vendor.UNKNOWN, "N/A"
+        # probe both vendor families at once and keep the first identified one
+        # the other probe is still awaited (bounded by VENDOR_PROBE_TIMEOUT) so that no request outlives the call
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            probes = [executor.submit(self._broker_version_orionld), executor.submit(self._broker_version_java_spring)]
+            broker = next(filter(None, (probe.result() for probe in as_completed(probes))), None)
+        if broker is None:
+            return Vendor.UNKNOWN, "N/A"
+        _vendor_cache[self.url] = (broker, time.monotonic() + VENDOR_CACHE_TTL)
+        if self.persist_vendor:
+            _save_vendor(self.url, broker)
+        return broker
 
     def _broker_version_orionld(self) -> Optional[str]:
         """Requests the broker looking for Orion-LD version.
@@ -759,15 +969,10 @@ class Client:
         Optional[str]
             The Orion-LD version if found
         """
-        url = f"{self.url}/version"
-        headers = {
-            "Accept": "application/json",
-            "Content-Type": None,
-        }  # overrides session headers
         try:
-            r = self.session.get(url, headers=headers)
+            r = self._probe_session.get(self._url_version, timeout=VENDOR_PROBE_TIMEOUT)
             r.raise_for_status()
-            return Vendor.ORIONLD, r.json()["orionld version"]
+            return Vendor.ORIONLD, decode_json(r.content)["orionld version"]
         except Exception:
             return None
 
@@ -781,20 +986,14 @@ class Client:
         Optional[Tuple[Vendor, str]]
             A tuple composed of the Vendor and the broker version
         """
-        url = f"{self.url}/actuator"
-        headers = {
-            "Accept": "application/json",
-            "Content-Type": None,
-        }  # overrides session headers
         try:
-            r = self.session.get(f"{url}/health", headers=headers)
+            r = self._probe_session.get(self._url_actuator_info, timeout=VENDOR_PROBE_TIMEOUT)
             r.raise_for_status()
+            info = decode_json(r.content)
         except Exception:
             return None
-        try:
-            r = self.session.get(f"{url}/info", headers=headers)
-            r.raise_for_status()
-            build = r.json()["build"]
+        try:  # an actuator is there : a Java-Spring based broker
+            build = info["build"]
             version = build["version"]
             group = build["group"]
             if group == "eu.neclab.ngsildbroker":
@@ -819,31 +1018,43 @@ class Client:
     def _warn_spring_message(self) -> str:
         return "Java-Spring based Context Broker detected. [orange3]Info endpoint disabled."
 
-    def _create_network(self, root: Entity, G: nx.Graph, nodecache: dict, edgecache: Set):
-        source: Tuple = Urn.split(root.id)
-        for _, nodeid in root.relationships:
+    def _create_network(self, root: Entity, nodes: List[Entity], nodeindex: dict, edges: dict):
+        # depth-first traversal : a stack of relationships iterators instead of recursive calls
+        stack = [(Urn.split(root.id), iter(root.relationships))]
+        while stack:
+            source, relationships = stack[-1]
+            rel = next(relationships, None)
+            if rel is None:  # all relationships of the source visited
+                stack.pop()
+                continue
+            nodeid = rel[1]
             target: Tuple = Urn.split(nodeid)
-            if (source, target) in edgecache or (target, source) in edgecache:
+            if (source, target) in edges or (target, source) in edges:
                 continue
-            edgecache.add((source, target))
-            G.add_edge(source, target)
+            edges[(source, target)] = None
+            nodeid = sys.intern(nodeid)
             logger.debug(f"cache lookup : {nodeid}")
-            entity = nodecache.get(nodeid)
-            logger.debug(f"{entity=}")
-            if entity is None:  # cache miss
+            idx = nodeindex.get(nodeid)
+            if idx is None:  # cache miss
                 try:
                     entity = self.get(nodeid)
-                    nodecache[nodeid] = entity
                 except NgsiResourceNotFoundError:
-                    pass
-            G = self._create_network(entity, G, nodecache, edgecache)
-        return G
+                    continue
+                nodeindex[nodeid] = len(nodes)
+                nodes.append(entity)
+            else:
+                entity = nodes[idx]
+            logger.debug(f"{entity=}")
+            stack.append((target, iter(entity.relationships)))
 
     def network(self, root: Entity):
+        nodes: List[Entity] = []  # entities retrieved from the broker
+        nodeindex: dict[str, int] = {}  # entity id => index in nodes
+        edges: dict[Tuple[Tuple, Tuple], None] = {}  # membership testing, keeps insertion order
+        self._create_network(root, nodes, nodeindex, edges)
         G = nx.Graph()
-        nodecache: dict[str, Entity] = {}  # hash table
-        edgecache: Set[Tuple[str, str]] = set()  # membership testing
-        return self._create_network(root, G, nodecache, edgecache)
+        G.add_edges_from(edges)
+        return G
 
     def enable_follow(self):
         follower = LinkFollower(self)
@@ -94,6 +94,23 @@ ENDPOINT_ALT_QUERY_TEMPORAL = "temporal/entityOperations/query"
 
 PAGINATION_LIMIT_MAX = 100  # pagination
 BATCHSIZE = 100  # maximum number of entities sent per batch operation
+CONCURRENCY = 8  # maximum number of pages requested simultaneously
+POOL_SIZE = 64  # maximum number of connections kept alive per host
+MAX_CONNECTIONS = 100  # maximum number of concurrent connections of the async client (the httpx default)
+MAX_RETRIES = 3  # retries on connection errors and RETRY_STATUS responses (idempotent requests only)
+RETRY_STATUS = (502, 503, 504)  # transient errors from the broker or a gateway
+GZIP_MIN_SIZE = 16 * 1024  # when compression is enabled, only payloads above this size (in bytes) are compressed
+PROBE_CACHE_TTL = 60  # seconds during which connect() reuses a successful connection check (same broker and tenant)
+HEALTH_CACHE_TTL = 5  # same for is_connected(), which must not report a broker that has gone down for long
+VENDOR_CACHE_TTL = 300  # seconds during which a guessed vendor is reused for the same broker
+VENDOR_DISK_CACHE_TTL = 3600  # same across processes, when the guessed vendor is persisted on disk
+HEAD_NOT_SUPPORTED = (405, 501)  # responses to HEAD requests from brokers that only implement GET
+KIND_NOT_SUPPORTED = (400, 501)  # responses to context listings filtered by kind from brokers lacking the filter
+VENDOR_PROBE_TIMEOUT = 5  # seconds to wait for a vendor specific endpoint before considering it absent
+WARMUP_TIMEOUT = 2  # seconds to wait for the background request opening a connection to the temporal endpoint
+ETAG_CACHE_SIZE = 32  # temporal responses kept to revalidate repeated requests with If-None-Match
+ETAG_CACHE_MAX_BYTES = 8 * 1024 * 1024  # total size of the temporal responses kept, larger responses are not kept
+SUBSCRIPTION_NON_CRITERIA = frozenset(("id", "name", "description", "isActive"))  # ignored by conflict detection
 
 DEFAULT_ATTR_FORMAT = None  # Let Orion default value => AttrsFormat.NORMALIZED
 DEFAULT_LOGLEVEL = LogLevel.WARN
@@ -10,7 +10,8 @@
 # Author: Fabien BATTELLO <fabien.battello@orange.com> et al.
 
 from __future__ import annotations
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING, Iterable, Literal, Optional
+from concurrent.futures import ThreadPoolExecutor
 import re
 import json
 import logging
@@ -19,11 +20,25 @@ if TYPE_CHECKING:
     from .client import Client
 
 from ngsildclient.model.constants import CORE_CONTEXT
+from .constants import CONCURRENCY, HEAD_NOT_SUPPORTED, KIND_NOT_SUPPORTED
 from .exceptions import rfc7807_error_handle
+from ..model.utils import decode_json
 
 
 logger = logging.getLogger(__name__)
 
+ContextKind = Literal["Hosted", "Cached", "ImplicitlyCreated"]
+
+
+def _filter_kind(contexts: list, kind: ContextKind) -> list:
+    """Keep the URLs of the contexts of the given kind. Contexts listed without details are kept as is."""
+    kind = kind.lower()
+    return [
+        x["url"] if isinstance(x, dict) else x
+        for x in contexts
+        if not isinstance(x, dict) or x.get("kind", "").lower() == kind
+    ]
+
 
 class Contexts:
     """A wrapper for the NGSI-LD API context endpoint."""
@@ -32,57 +47,73 @@ class Contexts:
         self._client = client
         self._session = client.session
         self.url = url
+        self._url_slash = f"{url}/"
+        self._head = True  # check existence with HEAD until the broker rejects it
 
     @rfc7807_error_handle
-    def list(self, pattern: str = None) -> Optional[dict]:
-        r = self._session.get(f"{self.url}")
-        contexts = r.json()
+    def list(self, pattern: str = None, kind: ContextKind = None) -> Optional[dict]:
+        """List the contexts, optionally filtered by kind and by regex pattern.
+
+        The kind filter is sent to the broker along with a request for details, so that it can be applied again
+        on the client side if the broker ignores it. A broker rejecting it is queried again without it.
+        """
+        r = self._session.get(self.url, params={"kind": kind, "details": "true"} if kind else None)
+        if kind and r.status_code in KIND_NOT_SUPPORTED:
+            r = self._session.get(self.url, params={"details": "true"})
+        contexts = decode_json(r.content)
+        if kind:
+            contexts = _filter_kind(contexts, kind)
         if pattern is not None:
-            contexts = [x for x in contexts if re.search(pattern, x, re.IGNORECASE)]
+            prog = re.compile(pattern, re.IGNORECASE)
+            contexts = [x for x in contexts if prog.search(x)]
         return contexts
 
     @rfc7807_error_handle
     def get(self, ctx: str) -> dict:
-        r = self._session.get(f"{self.url}/{ctx}")
+        r = self._session.get(self._url_slash + ctx)
         self._client.raise_for_status(r)
-        return r.json()
+        return decode_json(r.content)
 
     @rfc7807_error_handle
     def _delete(self, ctx: str) -> bool:
-        r = self._session.delete(f"{self.url}/{ctx}")
+        r = self._session.delete(self._url_slash + ctx)
         self._client.raise_for_status(r)
-        return bool(r)
+        return 200 <= r.status_code < 300
+
+    def _delete_many(self, contexts: Iterable[str]) -> bool:
+        """Delete the given contexts concurrently. Return True if at least one has been deleted."""
+        with ThreadPoolExecutor(max_workers=CONCURRENCY) as executor:
+            return any(list(executor.map(self._delete, contexts)))
 
     @rfc7807_error_handle
     def delete(self, ctx: str, pattern: str = None) -> bool:
         if pattern is None:
             return self._delete(ctx)
-        deleted = False
-        for ctx in self.list():
-            if re.search(pattern, ctx, re.IGNORECASE):
-                deleted |= self.delete(ctx)
-        return deleted
+        return self._delete_many(self.list(pattern))
 
     @rfc7807_error_handle
     def exists(self, ctx: str) -> bool:
-        r = self._session.get(f"{self.url}/{ctx}")
+        if self._head:
+            r = self._session.head(self._url_slash + ctx)
+            if r.status_code not in HEAD_NOT_SUPPORTED:
+                return r.ok
+            self._head = False
+        r = self._session.get(self._url_slash + ctx)
         if r:
-            payload = r.json()
+            payload = decode_json(r.content)
             return "@context" in payload
         return False
 
     @rfc7807_error_handle
     def cleanup(self) -> None:
         """Delete all contexts except the Core context."""
-        for ctx in self.list():
-            if ctx != CORE_CONTEXT:
-                self.delete(ctx)
+        self._delete_many(ctx for ctx in self.list() if ctx != CORE_CONTEXT)
 
     @rfc7807_error_handle
     def add(self, ctx: dict):
         if not ctx.get("@context"):
             raise ValueError("Expect a JSON object that has a top-level field named @context.")
-        r = self._session.post(f"{self.url}/", json=ctx)
+        r = self._client._post(self._url_slash, ctx)
         self._client.raise_for_status(r)
 
     @rfc7807_error_handle
@@ -11,10 +11,14 @@
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Sequence
+from typing import TYPE_CHECKING, Mapping, Optional, Sequence, Tuple, Union
+from types import MappingProxyType
+from functools import lru_cache
 
 import logging
 
+from requests import Response
+
 from ngsildclient.model.exceptions import NgsiJsonError
 
 if TYPE_CHECKING:
@@ -22,13 +26,30 @@ if TYPE_CHECKING:
     from ..model.constants import EntityOrId
 
 from ..utils.urn import Urn
-from .constants import ENDPOINT_ENTITIES, JSONLD_CONTEXT
+from .constants import ENDPOINT_ENTITIES, JSONLD_CONTEXT, HEAD_NOT_SUPPORTED
 from .exceptions import NgsiAlreadyExistsError, rfc7807_error_handle
 from ..model.entity import Entity
+from ..model.utils import decode_json, encode_json
 
 
 logger = logging.getLogger(__name__)
 
+# request headers overriding the session ones, shared by all requests
+HEADERS_GET = MappingProxyType({"Accept": "application/ld+json", "Content-Type": None})
+HEADERS_POST_QUERY = MappingProxyType({"Accept": "application/ld+json", "Content-Type": "application/json"})
+
+
+@lru_cache(maxsize=32)
+def _link(ctx: str) -> str:
+    return f'<{ctx}>; rel="{JSONLD_CONTEXT}"; type="application/ld+json"'
+
+
+def _with_context(headers: Mapping[str, Optional[str]], ctx: Optional[str]) -> Mapping[str, Optional[str]]:
+    """Add the Link header referencing the given context, if any."""
+    if ctx is None:
+        return headers
+    return {**headers, "Link": _link(ctx)}
+
 
 class Entities:
     """A wrapper for the NGSI-LD API entities endpoint."""
@@ -37,18 +58,21 @@ class Entities:
         self._client = client
         self._session = client.session
         self.url = url
+        self._url_slash = f"{url}/"
         self.url_alt_post_query = url_alt_post_query
+        self._url_broker = f"{client.scheme}://{client.hostname}:{client.port}/{ENDPOINT_ENTITIES}/"
+        self._head = True  # check existence with HEAD until the broker rejects it
+
+    @staticmethod
+    def _id(entity: EntityOrId) -> str:
+        return entity.id if isinstance(entity, Entity) else Urn.prefix(entity)
 
     def to_broker_url(self, entity: EntityOrId) -> str:
-        eid = entity.id if isinstance(entity, Entity) else Urn.prefix(entity)
-        return f"http://{self._client.hostname}:{self._client.port}/{ENDPOINT_ENTITIES}/{eid}"
+        return self._url_broker + self._id(entity)
 
     @rfc7807_error_handle
     def create(self, entity: Entity, skip: bool = False, overwrite: bool = False) -> bool:
-        r = self._session.post(
-            f"{self.url}/",
-            data=entity.to_json(),
-        )
+        r = self._client._post(self._url_slash, entity)
         if r.status_code == 409:  # already exists
             if skip:
                 return False
@@ -66,33 +90,32 @@ class Entities:
         asdict: bool = False,
         **kwargs,
     ) -> Entity:
-        eid = entity.id if isinstance(entity, Entity) else Urn.prefix(entity)
-        headers = {
-            "Accept": "application/ld+json",
-            "Content-Type": None,
-        }  # overrides session headers
-        if ctx is not None:
-            headers["Link"] = f'<{ctx}>; rel="{JSONLD_CONTEXT}"; type="application/ld+json"'
-        r = self._session.get(f"{self.url}/{eid}", headers=headers, **kwargs)
+        eid = self._id(entity)
+        headers = _with_context(HEADERS_GET, ctx)
+        r = self._session.get(self._url_slash + eid, headers=headers, **kwargs)
         self._client.raise_for_status(r)
-        return r.json() if asdict else Entity.from_dict(r.json())
+        payload = decode_json(r.content)
+        return payload if asdict else Entity.from_dict(payload)
 
     @rfc7807_error_handle
     def delete(self, entity: EntityOrId) -> bool:
-        eid = entity.id if isinstance(entity, Entity) else Urn.prefix(entity)
-        logger.info(f"{eid=}")
-        logger.info(f"url={self.url}/{eid}")
-        r = self._session.delete(f"{self.url}/{eid}")
-        logger.info(f"requests: {r.request.url}")
+        eid = self._id(entity)
+        r = self._session.delete(self._url_slash + eid)
+        logger.info("requests: %s", r.request.url)
         self._client.raise_for_status(r)
-        return bool(r)
+        return 200 <= r.status_code < 300
 
     @rfc7807_error_handle
     def exists(self, entity: EntityOrId) -> bool:
-        eid = entity.id if isinstance(entity, Entity) else Urn.prefix(entity)
-        r = self._session.get(f"{self.url}/{eid}")
+        eid = self._id(entity)
+        if self._head:
+            r = self._session.head(self._url_slash + eid)
+            if r.status_code not in HEAD_NOT_SUPPORTED:
+                return r.ok
+            self._head = False
+        r = self._session.get(self._url_slash + eid)
         if r:
-            payload = r.json()
+            payload = decode_json(r.content)
             return "@context" in payload
         return False
 
@@ -105,44 +128,96 @@ class Entities:
             return self.create(entity)
 
     @rfc7807_error_handle
-    def update(self, entity: Entity, check_exists: bool = True) -> bool:
+    def update(self, entity: Entity, check_exists: bool = True, partial: bool = False) -> bool:
+        """Update an existing entity.
+
+        By default the entity is replaced : deleted and created again.
+        If partial is set, the entity attributes are updated in place in a single request,
+        leaving untouched the attributes absent from the given entity.
+        Return False if the entity does not exist.
+        """
+        if partial:
+            return self._update_attrs(entity)
         if check_exists and self.exists(entity):
             self.delete(entity)
             return self.create(entity)
         return False
 
-    @rfc7807_error_handle
-    def _query(
-        self, type: str = None, q: str = None, gq: str = None, ctx: str = None, limit: int = 0, offset: int = 0
-    ) -> Sequence[Entity]:
-        params = {}
-        if limit != 0:
-            params |= {"limit": limit}
-        if offset != 0:
-            params |= {"offset": offset}
+    def _update_attrs(self, entity: Entity) -> bool:
+        fragment = {k: v for k, v in entity.to_dict().items() if k not in ("id", "type")}
+        r = self._session.patch(f"{self.url}/{entity.id}/attrs", data=encode_json(fragment))
+        if r.status_code == 404:
+            return False
+        self._client.raise_for_status(r)
+        return r.status_code == 204  # 207 : some attributes were not updated
+
+    @staticmethod
+    def _query_params(type: str = None, q: str = None, gq: str = None, limit: int = 0) -> dict:
+        """Build the query parameters that remain the same from one page to another."""
         if type is None and q is None:
             raise ValueError("Must indicate at least a type or a query string")
+        params = {}
+        if limit != 0:
+            params["limit"] = limit
         if type:
             params["type"] = type
         if q:
             params["q"] = q
         if gq:
             params["geoQ"] = gq
-        headers = {
-            "Accept": "application/ld+json",
-            "Content-Type": None,
-        }  # overrides session headers
-        if ctx is not None:
-            headers["Link"] = f'<{ctx}>; rel="{JSONLD_CONTEXT}"; type="application/ld+json"'
+        return params
+
+    def _get_page(self, params: dict, ctx: str = None) -> Response:
+        headers = _with_context(HEADERS_GET, ctx)
         r = self._session.get(
             self.url,
             headers=headers,
             params=params,
         )
         self._client.raise_for_status(r)
-        entities = r.json()
-        logger.debug(f"{entities=}")
-        return [Entity.from_dict(entity) for entity in entities]
+        return r
+
+    @rfc7807_error_handle
+    def _query_page(
+        self, params: dict, ctx: str = None, offset: int = 0, asdict: bool = False
+    ) -> Sequence[Union[Entity, dict]]:
+        if offset != 0:
+            params = {**params, "offset": offset}
+        r = self._get_page(params, ctx)
+        entities = decode_json(r.content)
+        logger.debug("entities=%s", entities)
+        return entities if asdict else Entity.from_dicts(entities)
+
+    @rfc7807_error_handle
+    def _query_page_with_count(
+        self, params: dict, ctx: str = None, asdict: bool = False
+    ) -> Tuple[Sequence[Union[Entity, dict]], int]:
+        """Retrieve the first page along with the total number of matching entities, in a single request."""
+        r = self._get_page({**params, "count": "true"}, ctx)
+        entities = decode_json(r.content)
+        logger.debug("entities=%s", entities)
+        count = int(r.headers["NGSILD-Results-Count"])
+        return (entities if asdict else Entity.from_dicts(entities)), count
+
+    @rfc7807_error_handle
+    def _query_ids_page(self, params: dict, offset: int = 0) -> Sequence[str]:
+        """Retrieve the ids of a page of entities, using the lighter keyValues representation."""
+        params = {**params, "options": "keyValues"}
+        if offset != 0:
+            params["offset"] = offset
+        r = self._get_page(params)
+        return [entity["id"] for entity in decode_json(r.content)]
+
+    @rfc7807_error_handle
+    def _query_ids_page_with_count(self, params: dict) -> Tuple[Sequence[str], int]:
+        """Retrieve the ids of the first page along with the total number of matching entities."""
+        r = self._get_page({**params, "options": "keyValues", "count": "true"})
+        return [entity["id"] for entity in decode_json(r.content)], int(r.headers["NGSILD-Results-Count"])
+
+    def _query(
+        self, type: str = None, q: str = None, gq: str = None, ctx: str = None, limit: int = 0, offset: int = 0
+    ) -> Sequence[Entity]:
+        return self._query_page(self._query_params(type, q, gq, limit), ctx, offset)
 
     @rfc7807_error_handle
     def _query_alt(self, query: dict, ctx: str = None, limit: int = 0, offset: int = 0) -> Sequence[Entity]:
@@ -150,35 +225,20 @@ class Entities:
             raise NgsiJsonError("Wrong format. Expect JSON-LD Query data type")
         params = {}
         if limit != 0:
-            params |= {"limit": limit}
+            params["limit"] = limit
         if offset != 0:
-            params |= {"offset": offset}
-        headers = {"Accept": "application/ld+json", "Content-Type": "application/json"}
-        if ctx is not None:
-            headers["Link"] = f'<{ctx}>; rel="{JSONLD_CONTEXT}"; type="application/ld+json"'
-        r = self._session.post(self.url_alt_post_query, headers=headers, params=params, json=query)
+            params["offset"] = offset
+        headers = _with_context(HEADERS_POST_QUERY, ctx)
+        r = self._client._post(self.url_alt_post_query, query, headers=headers, params=params)
         self._client.raise_for_status(r)
-        entities = r.json()
-        logger.debug(f"{entities=}")
-        return [Entity.from_dict(entity) for entity in entities]
+        entities = decode_json(r.content)
+        logger.debug("entities=%s", entities)
+        return Entity.from_dicts(entities)
 
     @rfc7807_error_handle
     def count(self, type: str = None, q: str = None, gq: str = None, ctx: str = None) -> int:
-        params = {"limit": 0, "count": "true"}
-        if type is None and q is None:
-            raise ValueError("Must indicate at least a type or a query string")
-        if type:
-            params["type"] = type
-        if q:
-            params["q"] = q
-        if gq:
-            params["geoQ"] = gq
-        headers = {
-            "Accept": "application/ld+json",
-            "Content-Type": None,
-        }  # overrides session headers
-        if ctx is not None:
-            headers["Link"] = f'<{ctx}>; rel="{JSONLD_CONTEXT}"; type="application/ld+json"'
+        params = {"limit": 0, "count": "true", **self._query_params(type, q, gq)}
+        headers = _with_context(HEADERS_GET, ctx)
         r = self._session.get(
             self.url,
             headers=headers,
@@ -192,13 +252,8 @@ class Entities:
         params = {"limit": 0, "count": "true"}
         if query.get("type") != "Query":
             raise NgsiJsonError("Wrong format. Expect JSON-LD Query data type")
-        headers = {
-            "Accept": "application/ld+json",
-            "Content-Type": None,
-        }
-        if ctx is not None:
-            headers["Link"] = f'<{ctx}>; rel="{JSONLD_CONTEXT}"; type="application/ld+json"'
-        r = self._session.post(self.url_alt_post_query, headers=headers, params=params, json=query)
+        headers = _with_context(HEADERS_POST_QUERY, ctx)  # the query is plain JSON
+        r = self._client._post(self.url_alt_post_query, query, headers=headers, params=params)
         self._client.raise_for_status(r)
         count = int(r.headers["NGSILD-Results-Count"])
         return count
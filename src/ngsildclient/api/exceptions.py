@@ -23,10 +23,13 @@ from dataclasses import dataclass
 from requests.exceptions import HTTPError, ContentDecodingError, RequestException
 from requests import Response
 from ..exceptions import NgsiError
+from ..utils import slotted
+from ..model.utils import decode_json
 
 logger = logging.getLogger(__name__)
 
 
+@slotted
 @dataclass
 class ProblemDetails:
     type: str
@@ -121,6 +124,25 @@ ERRORTYPES = {
 }
 
 
+_STD_KEYS = frozenset(("type", "title", "detail", "instance"))
+
+
+def _broker_error(problemdetails: dict, status: int) -> NgsiContextBrokerError:
+    """Map a ProblemDetails payload to the matching exception, without mutating the payload."""
+    pd_type = problemdetails["type"].rstrip()
+    exception: NgsiContextBrokerError = ERRORTYPES.get(pd_type)
+    logger.info("pd_type=%s exception=%s", pd_type, exception)
+    pd = ProblemDetails(
+        pd_type,
+        problemdetails.get("title"),
+        status,
+        problemdetails.get("detail"),
+        problemdetails.get("instance"),
+        {k: v for k, v in problemdetails.items() if k not in _STD_KEYS},  # extension
+    )
+    return exception(pd)
+
+
 def rfc7807_error_handle(func):
     """A decorator function to handle enriched Exceptions that accept a ProblemDetails instance.
 
@@ -137,24 +159,12 @@ def rfc7807_error_handle(func):
         except HTTPError as e:
             r: Response = e.response
             try:
-                problemdetails = r.json()
-                logger.info(f"{problemdetails=}")
-            except ContentDecodingError:
+                problemdetails = decode_json(r.content)
+                logger.info("problemdetails=%s", problemdetails)
+            except (ContentDecodingError, ValueError):  # not a JSON body
                 raise NgsiHttpError(r.status_code) from e
             try:
-                pd_type = problemdetails.pop("type").rstrip()
-                logger.info(f"{pd_type=}")
-                exception: NgsiContextBrokerError = ERRORTYPES.get(pd_type)
-                logger.info(f"{exception=}")
-                pd = ProblemDetails(
-                    pd_type,
-                    problemdetails.pop("title", None),
-                    r.status_code,
-                    problemdetails.pop("detail", None),
-                    problemdetails.pop("instance", None),
-                    problemdetails,  # extension
-                )
-                raise exception(pd)
+                raise _broker_error(problemdetails, r.status_code)
             except HTTPError as e:
                 raise NgsiApiError(f"Error while requesting the broker API. Status code = {r.status_code}") from e
         except RequestException as e:
@@ -179,24 +189,12 @@ def rfc7807_error_handle_async(func):
         except httpx.HTTPStatusError as e:
             r: httpx.Response = e.response
             try:
-                problemdetails = r.json()
-                logger.info(f"{problemdetails=}")
-            except httpx.DecodingError:
+                problemdetails = decode_json(r.content)
+                logger.info("problemdetails=%s", problemdetails)
+            except (httpx.DecodingError, ValueError):  # not a JSON body
                 raise NgsiHttpError(r.status_code) from e
             try:
-                pd_type = problemdetails.pop("type").rstrip()
-                logger.info(f"{pd_type=}")
-                exception: NgsiContextBrokerError = ERRORTYPES.get(pd_type)
-                logger.info(f"{exception=}")
-                pd = ProblemDetails(
-                    pd_type,
-                    problemdetails.pop("title", None),
-                    r.status_code,
-                    problemdetails.pop("detail", None),
-                    problemdetails.pop("instance", None),
-                    problemdetails,  # extension
-                )
-                raise exception(pd)
+                raise _broker_error(problemdetails, r.status_code)
             except httpx.HTTPStatusError as e:
                 raise NgsiApiError(f"Error while requesting the broker API. Status code = {r.status_code}") from e
         except httpx.RequestError as e:
@@ -12,9 +12,26 @@
 from dataclasses import dataclass
 
 import ngsildclient.utils.url as url
+from ngsildclient.utils import slotted
 from ngsildclient.model.constants import CORE_CONTEXT
 
+# keys always emitted by Subscription.to_dict(), even when falsy
+_MANDATORY_KEYS = frozenset(("type", "isActive", "notification", "@context"))
 
+
+def _check_str(value, msg: str):
+    if not isinstance(value, str):
+        raise ValueError(msg)
+
+
+def _check_list(value, msg: str):
+    if not isinstance(value, list):
+        raise ValueError(msg)
+    if not value:
+        raise ValueError("Empty array is not allowed")
+
+
+@slotted
 @dataclass
 class NotificationParams:
     uri: str
@@ -22,14 +39,13 @@ class NotificationParams:
     format: str = "normalized"
 
     def to_dict(self) -> dict:
-        d = {}
+        endpoint = {"uri": self.uri, "accept": "application/ld+json"}
         if self.attrs:
-            d["attributes"] = self.attrs
-        d["format"] = self.format
-        d["endpoint"] = {"uri": self.uri, "accept": "application/ld+json"}
-        return d
+            return {"attributes": self.attrs, "format": self.format, "endpoint": endpoint}
+        return {"format": self.format, "endpoint": endpoint}
 
 
+@slotted
 @dataclass
 class Subscription:
     notification: NotificationParams
@@ -52,24 +68,19 @@ class Subscription:
     ctx: str = CORE_CONTEXT
 
     def to_dict(self) -> dict:
-        d = {}
-        if self.id:
-            d["id"] = self.id
-        d["type"] = self.type
-        if self.name:
-            d["name"] = self.name
-        if self.description:
-            d["description"] = self.description
-        if self.entities:
-            d["entities"] = self.entities
-        if self.watched_attrs:
-            d["watchedAttributes"] = self.watched_attrs
-        if self.query:
-            d["q"] = self.query
-        d["isActive"] = self.active
-        d["notification"] = self.notification.to_dict()
-        d["@context"] = self.ctx
-        return d
+        pairs = (
+            ("id", self.id),
+            ("type", self.type),
+            ("name", self.name),
+            ("description", self.description),
+            ("entities", self.entities),
+            ("watchedAttributes", self.watched_attrs),
+            ("q", self.query),
+            ("isActive", self.active),
+            ("notification", self.notification.to_dict()),
+            ("@context", self.ctx),
+        )
+        return {k: v for k, v in pairs if v or k in _MANDATORY_KEYS}
 
 
 class SubscriptionBuilder:
@@ -82,66 +93,52 @@ class SubscriptionBuilder:
         self._subscr.entities = []
 
     def id(self, value: str):
-        if not isinstance(value, str):
-            raise ValueError("id shall be a string")
+        _check_str(value, "id shall be a string")
         self._subscr.id = value
         return self
 
     def name(self, value: str):
-        if not isinstance(value, str):
-            raise ValueError("name shall be a string")
+        _check_str(value, "name shall be a string")
         self._subscr.name = value
         return self
 
     def description(self, value: str):
-        if not isinstance(value, str):
-            raise ValueError("description shall be a string")
+        _check_str(value, "description shall be a string")
         self._subscr.description = value
         return self
 
     def select_id(self, value: str):
-        if not isinstance(value, str):
-            raise ValueError("EntitySelector id shall be a string")
+        _check_str(value, "EntitySelector id shall be a string")
         self._subscr.entities.append({"id": value})
         return self
 
     def select_idpattern(self, value: str):
-        if not isinstance(value, str):
-            raise ValueError("EntitySelector idPattern shall be a string")
+        _check_str(value, "EntitySelector idPattern shall be a string")
         self._subscr.entities.append({"idPattern": value})
         return self
 
     def select_type(self, value: str):
-        if not isinstance(value, str):
-            raise ValueError("EntitySelector type shall be a string")
+        _check_str(value, "EntitySelector type shall be a string")
         self._subscr.entities.append({"type": value})
         return self
 
     def watch(self, value: list[str]):
-        if not isinstance(value, list):
-            raise ValueError("watchedAttributes shall be a list of strings")
-        if value == []:
-            raise ValueError("Empty array is not allowed")
+        _check_list(value, "watchedAttributes shall be a list of strings")
         self._subscr.watched_attrs = value
         return self
 
     def query(self, value: str):
-        if not isinstance(value, str):
-            raise ValueError("query shall be a string")
+        _check_str(value, "query shall be a string")
         self._subscr.query = url.escape(value)
         return self
 
     def notif(self, value: list[str]):
-        if not isinstance(value, list):
-            raise ValueError("attribute names shall be a list of strings")
-        if value == []:
-            raise ValueError("Empty array is not allowed")
+        _check_list(value, "attribute names shall be a list of strings")
         self._subscr.notification.attrs = value
         return self
 
     def context(self, value: str):
-        if not isinstance(value, str):
-            raise ValueError("context shall be a string")
+        _check_str(value, "context shall be a string")
         self._subscr.ctx = value
         return self
 
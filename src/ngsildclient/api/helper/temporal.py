@@ -25,9 +25,10 @@ References
 
 from typing import Union, Optional
 from datetime import datetime, timedelta
+from dateutil.tz import UTC
 
 from ngsildclient.api.constants import TimeProperty
-from ngsildclient.utils.iso8601 import from_datetime
+from ngsildclient.utils.iso8601 import from_datetime, utcnow
 
 
 class TemporalQuery(dict):
@@ -39,7 +40,7 @@ class TemporalQuery(dict):
     ) -> dict:
         self["timerel"] = "after"
         if isinstance(start, timedelta):
-            self["timeAt"] = from_datetime(datetime.utcnow() - start)
+            self["timeAt"] = from_datetime(datetime.now(UTC) - start)
         elif isinstance(start, datetime):
             self["timeAt"] = from_datetime(start)
         else:
@@ -48,9 +49,12 @@ class TemporalQuery(dict):
             self["timeproperty"] = timeprop.value
         return self
 
-    def before(self, end: Union[datetime, str] = datetime.utcnow(), timeprop: Optional[TimeProperty] = None) -> dict:
+    def before(self, end: Union[datetime, str] = None, timeprop: Optional[TimeProperty] = None) -> dict:
         self["timerel"] = "before"
-        self["timeAt"] = from_datetime(end) if isinstance(end, datetime) else end
+        if end is None:  # now, evaluated at each call
+            self["timeAt"] = utcnow()
+        else:
+            self["timeAt"] = from_datetime(end) if isinstance(end, datetime) else end
         if timeprop is not None:
             self["timeproperty"] = timeprop.value
         return self
@@ -10,19 +10,22 @@
 # Author: Fabien BATTELLO <fabien.battello@orange.com> et al.
 
 from __future__ import annotations
-from typing import TYPE_CHECKING, Optional
-from functools import partialmethod
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
 from hashlib import sha1
+from copy import deepcopy
+from concurrent.futures import ThreadPoolExecutor
 
 import re
-import json
 
 from ..model.constants import CORE_CONTEXT
+from .constants import CONCURRENCY, SUBSCRIPTION_NON_CRITERIA
 from .exceptions import NgsiApiError
 
 if TYPE_CHECKING:
     from .client import Client
 from .exceptions import NgsiResourceNotFoundError, rfc7807_error_handle
+from .entities import HEADERS_GET, _with_context
+from ..model.utils import decode_json, encode_json
 
 
 class Subscriptions:
@@ -32,6 +35,9 @@ class Subscriptions:
         self._client = client
         self._session = client.session
         self.url = url
+        self._url_slash = f"{url}/"
+        self._listing: Optional[Tuple[Optional[str], str, List[dict]]] = None  # (ctx, ETag, subscriptions)
+        self._index: Optional[Dict[bytes, List[dict]]] = None  # the last listing indexed by criteria hash
 
     @rfc7807_error_handle
     def create(self, subscr: dict, raise_on_conflict: bool = True) -> bool:
@@ -39,7 +45,7 @@ class Subscriptions:
             conflicts = self.conflicts(subscr)
             if conflicts:
                 raise ValueError(f"Some subscriptions already exist with same target : {conflicts}")
-        r = self._session.post(f"{self.url}/", json=subscr)
+        r = self._client._post(self._url_slash, subscr)
         self._client.raise_for_status(r)
         location = r.headers.get("Location")
         if location is None:
@@ -53,61 +59,89 @@ class Subscriptions:
             raise NgsiApiError(f"Broker returned wrong id. Expected={id} Returned={id_returned_from_broker}")
         return id_returned_from_broker
 
+    @rfc7807_error_handle
+    def create_many(self, subscrs: Iterable[dict], raise_on_conflict: bool = True) -> List[str]:
+        """Create subscriptions, checking all of them for conflicts against a single listing of the broker ones.
+
+        Subscriptions sharing the same criteria within the given ones are also reported as conflicts.
+        Nothing is created if a conflict is found.
+        """
+        subscrs = list(subscrs)
+        if raise_on_conflict:
+            conflicts = self._conflicts_many(self._criteria_index(), subscrs)
+            if conflicts:
+                raise ValueError(f"Some subscriptions already exist with same target : {conflicts}")
+        return [self.create(subscr, raise_on_conflict=False) for subscr in subscrs]
+
+    @staticmethod
+    def _conflicts_many(index: Dict[bytes, List[dict]], subscrs: List[dict]) -> list:
+        conflicts = []
+        seen = set()
+        for subscr in subscrs:
+            h = Subscriptions._hash(subscr)
+            conflicts.extend([subscr] if h in seen else index.get(h, []))
+            seen.add(h)
+        return conflicts
+
     @rfc7807_error_handle
     def list(self, pattern: str = None, ctx: str = CORE_CONTEXT) -> Optional[dict]:
-        headers = {
-            "Accept": "application/ld+json",
-            "Content-Type": None,
-        }  # overrides session headers
-        if ctx is not None:
-            headers["Link"] = f'<{ctx}>; rel="{CORE_CONTEXT}"; type="application/ld+json"'
-        r = self._session.get(f"{self.url}")
-        subscriptions = r.json()
+        subscriptions = self._list_all(ctx)
         if pattern is not None:
+            prog = re.compile(pattern, re.IGNORECASE)
             subscriptions = [
-                x
-                for x in subscriptions
-                if re.search(pattern, x.get("name", "") + x.get("description", ""), re.IGNORECASE)
+                x for x in subscriptions if prog.search(x.get("name", "")) or prog.search(x.get("description", ""))
             ]
-        return subscriptions
+        return deepcopy(subscriptions)  # the last listing may be reused
 
     @staticmethod
     def _criteria_only(subscr: dict):
-        params = subscr.copy()
-        params.pop("id", None)
-        params.pop("name", None)
-        params.pop("description", None)
-        params.pop("isActive", None)
-        return params
+        return {k: v for k, v in subscr.items() if k not in SUBSCRIPTION_NON_CRITERIA}
 
     @staticmethod
     def _hash(subscr: dict):
         criteria = Subscriptions._criteria_only(subscr)
-        return sha1(json.dumps(criteria, sort_keys=True).encode("utf-8")).digest()
+        return sha1(encode_json(criteria, sort_keys=True)).digest()
+
+    def _list_all(self, ctx: str = CORE_CONTEXT) -> List[dict]:
+        """Retrieve all the broker subscriptions.
+
+        If the broker tags the list with an ETag, the last listing (and its index) is reused as long as it is unchanged.
+        """
+        headers = _with_context(HEADERS_GET, ctx)
+        if self._listing is not None and self._listing[0] == ctx:
+            headers = {**headers, "If-None-Match": self._listing[1]}
+        r = self._session.get(self.url, headers=headers)
+        if r.status_code == 304:
+            return self._listing[2]
+        self._client.raise_for_status(r)
+        subscriptions = decode_json(r.content)
+        etag = r.headers.get("ETag")
+        self._listing = (ctx, etag, subscriptions) if etag else None
+        self._index = None
+        return subscriptions
+
+    def _criteria_index(self, ctx: str = CORE_CONTEXT) -> Dict[bytes, List[dict]]:
+        """Index the broker subscriptions by criteria hash."""
+        subscriptions = self._list_all(ctx)
+        if self._index is not None:
+            return self._index
+        index: Dict[bytes, List[dict]] = {}
+        for x in subscriptions:
+            index.setdefault(Subscriptions._hash(x), []).append(x)
+        if self._listing is not None:
+            self._index = index
+        return index
 
     @rfc7807_error_handle
     def conflicts(self, subscr: dict, ctx: str = CORE_CONTEXT) -> list:
-        hashref = Subscriptions._hash(subscr)
-        headers = {
-            "Accept": "application/ld+json",
-            "Content-Type": None,
-        }  # overrides session headers
-        if ctx is not None:
-            headers["Link"] = f'<{ctx}>; rel="{CORE_CONTEXT}"; type="application/ld+json"'
-        r = self._session.get(f"{self.url}")
-        return [x for x in r.json() if Subscriptions._hash(x) == hashref]
+        return deepcopy(self._criteria_index(ctx).get(Subscriptions._hash(subscr), []))
 
     @rfc7807_error_handle
     def get(self, id: str, ctx: str = CORE_CONTEXT) -> dict:
-        headers = {
-            "Accept": "application/ld+json",
-            "Content-Type": None,
-        }  # overrides session headers
-        if ctx is not None:
-            headers["Link"] = f'<{ctx}>; rel="{CORE_CONTEXT}"; type="application/ld+json"'
-        r = self._session.get(f"{self.url}/{id}", headers=headers)
+        headers = _with_context(HEADERS_GET, ctx)
+        r = self._session.get(self._url_slash + id, headers=headers)
         self._client.raise_for_status(r)
-        return r.json()
+        return decode_json(r.content)
 
     @rfc7807_error_handle
     def exists(self, id: str, ctx: str = CORE_CONTEXT) -> bool:
@@ -121,15 +155,15 @@ class Subscriptions:
 
     @rfc7807_error_handle
     def _delete(self, id: str) -> bool:
-        r = self._session.delete(f"{self.url}/{id}")
+        r = self._session.delete(self._url_slash + id)
         self._client.raise_for_status(r)
-        return bool(r)
+        return 200 <= r.status_code < 300
 
     @rfc7807_error_handle
-    def delete(self, pattern: str) -> bool:
-        deleted = False
-        for subscription in self.list(pattern):
-            deleted |= self._delete(subscription["id"])
-        return deleted
+    def delete(self, pattern: Optional[str]) -> bool:
+        ids = [subscription["id"] for subscription in self.list(pattern)]
+        with ThreadPoolExecutor(max_workers=CONCURRENCY) as executor:
+            return any(list(executor.map(self._delete, ids)))
 
-    purge = partialmethod(delete, pattern=None)
+    def purge(self) -> bool:
+        return self.delete(pattern=None)
@@ -10,54 +10,61 @@
 # Author: Fabien BATTELLO <fabien.battello@orange.com> et al.
 
 from __future__ import annotations
-from typing import TYPE_CHECKING, Union, List, Optional, Generator, Callable
+from typing import TYPE_CHECKING, Union, List, Iterable, Optional, Generator, Callable, Dict, Mapping, Tuple
 from dataclasses import dataclass
 from datetime import timedelta
 from isodate import duration_isoformat
-from functools import reduce
-from operator import iconcat
 
 
 import logging
+import threading
+
+from requests import Response
+from requests.exceptions import RequestException
 
 if TYPE_CHECKING:
     from .client import Client
 
-from .constants import JSONLD_CONTEXT, AggrMethod
+from .constants import AggrMethod, ETAG_CACHE_SIZE, ETAG_CACHE_MAX_BYTES, WARMUP_TIMEOUT
 from ..utils.urn import Urn
 from .helper.temporal import TemporalQuery
 from ..model.entity import Entity
-from ngsildclient.utils import iso8601, is_pandas_installed, _addopt
+from ..model.utils import decode_json
+from ngsildclient.utils import iso8601, is_pandas_installed, is_ijson_installed, prefetch, _addopt
 from .temporal_alt import TemporalAlt
+from .entities import HEADERS_GET, _with_context
 
 logger = logging.getLogger(__name__)
 
 
 def _troes_to_dfdict(troes: dict):
     # the result dictionary is independant of the number of attributes !
-    d = {}
     if not isinstance(troes, List):
         troes = [troes]
     troe: dict = troes[0]
     nentities = len(troes)
     attrs = [str(k) for k in troe.keys() if k not in ("id", "type", "@context")]
-    attr0 = attrs[0]
-    datetimes = [x[1] for x in troe[attr0]["values"]]
+    datetimes = [x[1] for x in troe[attrs[0]]["values"]]
     nmeasures: int = len(datetimes)
     for attr in attrs[1:]:
         if [x[1] for x in troe[attr]["values"]] != datetimes:
             raise ValueError("Cannot pack result : attributes have distinct observedAt values.")
-    etype = troe["type"]
-    d[etype] = reduce(iconcat, [[troe["id"].rsplit(":")[-1]] * nmeasures for troe in troes], [])
-    d["observed"] = [iso8601.parse(x)[2] for x in datetimes] * nentities
+    d = {troe["type"]: [troe["id"].rsplit(":")[-1] for troe in troes for _ in range(nmeasures)]}
+    d["observed"] = [iso8601.parse(x)[2] for x in datetimes] * nentities  # parsed once per measure
     for attr in attrs:
-        d[attr] = []
-        for troe in troes:
-            for value in troe[attr]["values"]:
-                d[attr].append(value[0])
+        d[attr] = [value[0] for troe in troes for value in troe[attr]["values"]]
     return d
 
 
+def _iter_items(r: Response) -> Generator[dict, None, None]:
+    """Parse the JSON array of a streamed response incrementally, as its content is received. Requires ijson."""
+    import ijson
+
+    r.raw.decode_content = True  # let urllib3 uncompress the content
+    with r:
+        yield from ijson.items(r.raw, "item", use_float=True)
+
+
 def troes_to_dataframe(troes: dict):
     d = _troes_to_dfdict(troes)
     try:
@@ -85,8 +92,9 @@ class Pagination:
 
 @dataclass
 class TemporalResult:
-    result: List[dict]
+    result: Iterable[dict]  # a list, unless streamed
     pagination: Optional[Pagination] = None
+    response: Optional[Response] = None  # streamed results only : to be closed if the result is not consumed
 
 
 class Temporal:
@@ -96,13 +104,66 @@ class Temporal:
         self._client = client
         self._session = client.session
         self.url = url
+        self._url_slash = f"{url}/"
         self.url_alt_temporal_query = url_alt_temporal_query
         self._alt = TemporalAlt(self._client, url_alt_temporal_query)
+        self._etags: Dict[tuple, Tuple[str, bytes, Mapping[str, str]]] = {}  # request -> (ETag, content, headers)
+        self._etags_size = 0  # total size of the cached contents
+        self._etags_lock = threading.Lock()  # pages may be fetched from a prefetching thread
 
     @property
     def alt(self):
         return self._alt
 
+    def warmup(self) -> threading.Thread:
+        """Open a connection to the temporal endpoint in the background, so that the first query finds it in the pool.
+
+        Only useful when the temporal endpoint is not served by the broker the client has already connected to.
+        """
+
+        def head():
+            try:
+                self._session.head(self.url, timeout=WARMUP_TIMEOUT)
+            except RequestException as e:
+                logger.debug("Temporal endpoint warmup failed : %s", e)
+
+        thread = threading.Thread(target=head, daemon=True)
+        thread.start()
+        return thread
+
+    def _get_revalidated(self, url: str, headers: Mapping[str, Optional[str]], params: dict) -> TemporalResult:
+        """Send a GET request and decode the response.
+
+        If the broker tagged the last response to the same request with an ETag, the request is conditional
+        and on 304 Not Modified the cached response is decoded instead of being downloaded again.
+        The cache is bounded in number of responses and in bytes.
+        """
+        key = (url, tuple(headers.items()), tuple(params.items()))
+        with self._etags_lock:
+            cached = self._etags.get(key)
+        if cached is not None:
+            headers = {**headers, "If-None-Match": cached[0]}
+        r = self._session.get(url, headers=headers, params=params)
+        if r.status_code == 304 and cached is not None:
+            _, content, headers = cached
+            return TemporalResult(decode_json(content), Pagination.from_headers(headers))
+        self._client.raise_for_status(r)
+        etag = r.headers.get("ETag")
+        if etag and len(r.content) <= ETAG_CACHE_MAX_BYTES:
+            self._cache_response(key, etag, r)
+        return TemporalResult(decode_json(r.content), Pagination.from_headers(r.headers))
+
+    def _cache_response(self, key: tuple, etag: str, r: Response):
+        with self._etags_lock:
+            previous = self._etags.pop(key, None)
+            if previous is not None:
+                self._etags_size -= len(previous[1])
+            self._etags[key] = (etag, r.content, r.headers)
+            self._etags_size += len(r.content)
+            while len(self._etags) > ETAG_CACHE_SIZE or self._etags_size > ETAG_CACHE_MAX_BYTES:
+                _, content, _ = self._etags.pop(next(iter(self._etags)))  # evict the oldest response
+                self._etags_size -= len(content)
+
     def _get(
         self,
         eid: Union[str, Entity],
@@ -116,15 +177,9 @@ class Temporal:
     ) -> TemporalResult:
         eid = eid.id if isinstance(eid, Entity) else Urn.prefix(eid)
         params = {}
-        headers = {
-            "Accept": "application/ld+json",
-            "Content-Type": None,
-        }  # overrides session headers
-        if ctx is not None:
-            headers["Link"] = f'<{ctx}>; rel="{JSONLD_CONTEXT}"; type="application/ld+json"'
+        headers = _with_context(HEADERS_GET, ctx)
         if count:
             _addopt(params, "count")
-        params = {}
         if attrs:
             params["attrs"] = ",".join(attrs)
         if lastn > 0:
@@ -135,9 +190,7 @@ class Temporal:
             params["pageAnchor"] = pageanchor
         if not verbose:
             _addopt(params, "temporalValues")
-        r = self._session.get(f"{self.url}/{eid}", headers=headers, params=params)
-        self._client.raise_for_status(r)
-        return TemporalResult(r.json(), Pagination.from_headers(r.headers))
+        return self._get_revalidated(self._url_slash + eid, headers, params)
 
     #  equivalent to get_all()
     def get(
@@ -185,21 +238,19 @@ class Temporal:
             troes.extend(r.result)
         return troes_to_dataframe(troes) if as_dataframe else troes
 
-    def _query(
-        self,
+    @staticmethod
+    def _query_params(
         eid: Union[str, Entity] = None,
         type: str = None,
         attrs: List[str] = None,
         q: str = None,
         gq: str = None,
-        ctx: str = None,
         verbose: bool = False,
         tq: TemporalQuery = None,
         lastn: int = 0,
         pagesize: int = 0,  # default broker pageSize
-        pageanchor: str = None,
         count: bool = True,
-    ) -> TemporalResult:
+    ) -> dict:
         params = {}
         if eid:
             params["id"] = Urn.prefix(eid)
@@ -222,21 +273,38 @@ class Temporal:
             params["lastN"] = lastn
         if pagesize > 0:
             params["pageSize"] = pagesize
+        return params
+
+    def _query_page(
+        self, params: dict, ctx: str = None, pageanchor: str = None, stream: bool = False
+    ) -> TemporalResult:
         if pageanchor is not None:
-            params["pageAnchor"] = pageanchor
-        headers = {
-            "Accept": "application/ld+json",
-            "Content-Type": None,
-        }  # overrides session headers
-        if ctx is not None:
-            headers["Link"] = f'<{ctx}>; rel="{JSONLD_CONTEXT}"; type="application/ld+json"'
-        r = self._session.get(
-            self.url,
-            headers=headers,
-            params=params,
-        )
+            params = {**params, "pageAnchor": pageanchor}
+        headers = _with_context(HEADERS_GET, ctx)
+        if not stream:
+            return self._get_revalidated(self.url, headers, params)
+        r = self._session.get(self.url, headers=headers, params=params, stream=True)
         self._client.raise_for_status(r)
-        return TemporalResult(r.json(), Pagination.from_headers(r.headers))
+        return TemporalResult(_iter_items(r), Pagination.from_headers(r.headers), r)
+
+    def _query(
+        self,
+        eid: Union[str, Entity] = None,
+        type: str = None,
+        attrs: List[str] = None,
+        q: str = None,
+        gq: str = None,
+        ctx: str = None,
+        verbose: bool = False,
+        tq: TemporalQuery = None,
+        lastn: int = 0,
+        pagesize: int = 0,  # default broker pageSize
+        pageanchor: str = None,
+        count: bool = True,
+        stream: bool = False,
+    ) -> TemporalResult:
+        params = self._query_params(eid, type, attrs, q, gq, verbose, tq, lastn, pagesize, count)
+        return self._query_page(params, ctx, pageanchor, stream)
 
     def query_head(
         self,
@@ -325,22 +393,11 @@ class Temporal:
                 verbose = False  # force simplified representation
             else:
                 raise ValueError("Cannot export to dataframe : pandas not installed.")
-        r: TemporalResult = self._query(eid, type, attrs, q, gq, ctx, verbose, tq, lastn=lastn, pagesize=pagesize)
+        params = self._query_params(eid, type, attrs, q, gq, verbose, tq, lastn, pagesize)  # shared by all pages
+        r: TemporalResult = self._query_page(params, ctx)
         troes: List[dict] = r.result
         while r.pagination.next_url is not None:
-            r: TemporalResult = self._query(
-                eid,
-                type,
-                attrs,
-                q,
-                gq,
-                ctx,
-                verbose,
-                tq,
-                lastn=lastn,
-                pagesize=pagesize,
-                pageanchor=r.pagination.next_url,
-            )
+            r: TemporalResult = self._query_page(params, ctx, r.pagination.next_url)
             troes.extend(r.result)
         return troes_to_dataframe(troes) if as_dataframe else troes
 
@@ -357,15 +414,35 @@ class Temporal:
         tq: TemporalQuery = None,
         pagesize: int = 0,
     ) -> Generator[List[dict], None, None]:
-        r: TemporalResult = self._query(eid, type, attrs, q, gq, ctx, verbose, tq, pagesize=pagesize)
-        troes = r.result
-        yield from troes
-        while r.pagination.next_url is not None:
-            r: TemporalResult = self._query(
-                eid, type, attrs, q, gq, ctx, verbose, tq, pagesize=pagesize, pageanchor=r.pagination.next_url
-            )
-            troes = r.result
-            yield from troes
+        """Retrieve (as a generator) Temporal Representation of Entities (TRoE) given id, or type and/or query string.
+
+        If ijson is installed each page is parsed incrementally as it is received,
+        so that memory usage does not depend on the page size.
+        Page anchors being opaque, pages are chained : the next page is requested in the background
+        as soon as the current one is available.
+        """
+        params = self._query_params(eid, type, attrs, q, gq, verbose, tq, pagesize=pagesize)  # shared by all pages
+        stream = is_ijson_installed()
+
+        def pages() -> Generator[TemporalResult, None, None]:
+            r: TemporalResult = self._query_page(params, ctx, stream=stream)
+            try:
+                yield r
+                while r.pagination.next_url is not None:
+                    r = self._query_page(params, ctx, r.pagination.next_url, stream)
+                    yield r
+            finally:  # the last page fetched may never have been consumed
+                if r.response is not None:
+                    r.response.close()
+
+        pages_it = pages()
+        prefetched = prefetch(pages_it)  # request the next page while the current one is consumed
+        try:
+            for page in prefetched:
+                yield from page.result
+        finally:  # the caller may stop early
+            prefetched.close()  # waits for the page being fetched in the background
+            pages_it.close()
 
     def query_handle(
         self,
@@ -423,16 +500,5 @@ class Temporal:
             params["pageAnchor"] = pageanchor
         params["aggrMethods"] = ",".join([m.value for m in methods])
         params["aggrPeriodDuration"] = duration_isoformat(period)
-        headers = {
-            "Accept": "application/ld+json",
-            "Content-Type": None,
-        }  # overrides session headers
-        if ctx is not None:
-            headers["Link"] = f'<{ctx}>; rel="{JSONLD_CONTEXT}"; type="application/ld+json"'
-        r = self._session.get(
-            self.url,
-            headers=headers,
-            params=params,
-        )
-        self._client.raise_for_status(r)
-        return TemporalResult(r.json(), Pagination.from_headers(r.headers))
+        headers = _with_context(HEADERS_GET, ctx)
+        return self._get_revalidated(self.url, headers, params)
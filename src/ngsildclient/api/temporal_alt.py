@@ -20,9 +20,10 @@ if TYPE_CHECKING:
     from .client import Client
     from .temporal import TemporalResult, Pagination, troes_to_dataframe
 
-from .constants import JSONLD_CONTEXT
 from ..model.entity import Entity
-from ngsildclient.utils import is_pandas_installed
+from .entities import HEADERS_POST_QUERY, _with_context
+from ..model.utils import decode_json
+from ngsildclient.utils import is_pandas_installed, prefetch
 from ngsildclient.model.exceptions import NgsiJsonError
 
 logger = logging.getLogger(__name__)
@@ -53,15 +54,12 @@ class TemporalAlt:
             params["pageSize"] = pagesize
         if pageanchor is not None:
             params["pageAnchor"] = pageanchor
-        headers = {
-            "Accept": "application/ld+json",
-            "Content-Type": "application/json",
-        }
-        if ctx is not None:
-            headers["Link"] = f'<{ctx}>; rel="{JSONLD_CONTEXT}"; type="application/ld+json"'
-        r = self._session.post(self.url_alt_temporal_query, headers=headers, params=params, json=query)
+        headers = _with_context(HEADERS_POST_QUERY, ctx)
+        r = self._client._post(self.url_alt_temporal_query, query, headers=headers, params=params)
         self._client.raise_for_status(r)
-        return TemporalResult(r.json(), Pagination.from_headers(r.headers))
+        from .temporal import TemporalResult, Pagination  # not at module level : temporal imports this module
+
+        return TemporalResult(decode_json(r.content), Pagination.from_headers(r.headers))
 
     def query_head(
         self,
@@ -118,13 +116,16 @@ class TemporalAlt:
         if isinstance(query, Path):
             with open(query) as f:
                 query = json.load(f)
-        r: TemporalResult = self._query(query, ctx, pagesize=pagesize)
-        troes = r.result
-        yield from troes
-        while r.pagination.next_url is not None:
-            r: TemporalResult = self._query(query, ctx, pagesize=pagesize, pageanchor=r.pagination.next_url)
-            troes = r.result
-            yield from troes
+
+        def pages() -> Generator[TemporalResult, None, None]:
+            r: TemporalResult = self._query(query, ctx, pagesize=pagesize)
+            yield r
+            while r.pagination.next_url is not None:
+                r = self._query(query, ctx, pagesize=pagesize, pageanchor=r.pagination.next_url)
+                yield r
+
+        for page in prefetch(pages()):  # request the next page while the current one is consumed
+            yield from page.result
 
     def query_handle(
         self,
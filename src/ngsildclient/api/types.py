@@ -18,6 +18,7 @@ if TYPE_CHECKING:
     from .client import Client
 
 from .exceptions import rfc7807_error_handle
+from ..model.utils import decode_json
 
 
 logger = logging.getLogger(__name__)
@@ -31,5 +32,5 @@ class Types:
 
     @rfc7807_error_handle
     def list(self) -> Optional[dict]:
-        r = self._session.get(f"{self.url}")
-        return r.json()["typeList"]
+        r = self._session.get(self.url)
+        return decode_json(r.content)["typeList"]
@@ -19,6 +19,7 @@ import logging
 
 from copy import deepcopy
 from functools import partialmethod
+from itertools import chain
 from datetime import datetime
 from typing import (
     Sequence,
@@ -29,11 +30,14 @@ from typing import (
     Optional,
     Mapping,
     Callable,
+    Generator,
+    Iterable,
 )
 from multipledispatch import dispatch
 
 from ngsildclient.model.ngsidict import NgsiDict
-from ngsildclient.utils import iso8601, url
+from ngsildclient.model.utils import decode_json
+from ngsildclient.utils import iso8601, url, is_ijson_installed
 from ngsildclient.utils.urn import Urn
 from ngsildclient.model.exceptions import NgsiMissingIdError, NgsiMissingTypeError, NgsiMissingContextError
 from ngsildclient.model.constants import CORE_CONTEXT, LD_PREFIX, Rel, NgsiDate, NgsiGeometry
@@ -236,6 +240,30 @@ class Entity:
         """
         return cls(payload)
 
+    @classmethod
+    def from_dicts(cls, payloads: Iterable[dict]) -> List[Entity]:
+        """Create NGSI-LD entities from dictionaries.
+
+        Same as calling from_dict() on each dictionary, but the constructor is resolved once for the whole batch.
+
+        Parameters
+        ----------
+        payloads : Iterable[dict]
+            The given dictionaries.
+
+        Returns
+        -------
+        List[Entity]
+            The result Entity instances
+        """
+        init = cls.__init__.dispatch(dict)
+        entities = []
+        for payload in payloads:
+            entity = cls.__new__(cls)
+            init(entity, payload)
+            entities.append(entity)
+        return entities
+
     @classmethod
     def from_json(cls, content: str):
         """Create a NGSI-LD entity from JSON content.
@@ -589,12 +617,12 @@ class Entity:
         """
         if url.isurl(filename):
             resp = requests.get(filename)
-            payload = resp.json()
+            payload = decode_json(resp.content)
         else:
             with open(filename, "r") as fp:
                 payload = json.load(fp)
         if isinstance(payload, List):
-            return [cls.from_dict(x) for x in payload]
+            return cls.from_dicts(payload)
         return cls.from_dict(payload)
 
     @classmethod
@@ -626,13 +654,13 @@ class Entity:
         """
         if url.isurl(filename):
             resp = httpx.get(filename)
-            payload = resp.json()
+            payload = decode_json(resp.content)
         else:
             async with aiofiles.open(filename, "r") as fp:
                 contents = await fp.read()
                 payload = json.loads(contents)
         if isinstance(payload, List):
-            return [cls.from_dict(x) for x in payload]
+            return cls.from_dicts(payload)
         return cls.from_dict(payload)
 
     @classmethod
@@ -658,7 +686,54 @@ class Entity:
             payload = json.load(fp)
         if not isinstance(payload, List):
             raise ValueError("The JSON payload MUST be an array")
-        return [cls.from_dict(x) for x in payload]
+        return cls.from_dicts(payload)
+
+    @classmethod
+    def load_batches(cls, filename: str, batchsize: int) -> Generator[List[Entity], None, None]:
+        """Load entities from a JSON file, batch after batch.
+
+        If ijson is installed the file is parsed incrementally, so that memory usage does not depend on the file size.
+        Else the whole JSON array is parsed but entities are only instantiated batch after batch.
+
+        Parameters
+        ----------
+        filename : str
+            The input file must contain a JSON array
+        batchsize : int
+            The maximum number of entities in each batch
+
+        Returns
+        -------
+        Generator[List[Entity]]
+            A generator of lists of entities
+
+        Example
+        -------
+        >>> from ngsildclient import *
+        >>> for rooms in Entity.load_batches("/tmp/rooms_all.jsonld", 100):
+        >>>     print(len(rooms))
+        """
+        with open(filename, "rb") as fp:
+            if is_ijson_installed():
+                import ijson
+
+                events = ijson.parse(fp, use_float=True)
+                first = next(events, None)
+                if first is None or first[1] != "start_array":
+                    raise ValueError("The JSON payload MUST be an array")
+                payload = ijson.items(chain([first], events), "item")
+            else:
+                payload = json.load(fp)
+                if not isinstance(payload, List):
+                    raise ValueError("The JSON payload MUST be an array")
+            batch = []
+            for x in payload:
+                batch.append(cls.from_dict(x))
+                if len(batch) == batchsize:
+                    yield batch
+                    batch = []
+            if batch:
+                yield batch
 
     @classmethod
     async def load_batch_async(cls, filename: str):
@@ -684,7 +759,7 @@ class Entity:
             payload = json.loads(contents)
         if not isinstance(payload, List):
             raise ValueError("The JSON payload MUST be an array")
-        return [cls.from_dict(x) for x in payload]
+        return cls.from_dicts(payload)
 
     def save(self, filename: str, *, indent: int = 2):
         """Save the entity to a file.
@@ -11,9 +11,10 @@
 
 from __future__ import annotations
 
+import json
 import ngsildclient.model.entity as entity
 import ngsildclient.model.ngsidict as ngsidict
-from ngsildclient.utils import iso8601
+from ngsildclient.utils import iso8601, is_orjson_installed
 from ngsildclient.model.constants import TemporalType
 from ngsildclient.model.exceptions import NgsiDateFormatError
 
@@ -22,6 +23,11 @@ from typing import Literal, Tuple
 from collections.abc import Mapping
 from geojson import Point
 
+if is_orjson_installed():
+    import orjson
+else:
+    orjson = None
+
 
 class NgsiEncoder(JSONEncoder):
     def default(self, o):
@@ -30,6 +36,32 @@ class NgsiEncoder(JSONEncoder):
         return str
 
 
+def _default(o):
+    if isinstance(o, (ngsidict.NgsiDict, entity.Entity)):
+        return o.to_dict()
+    return str(o)
+
+
+def encode_json(obj, sort_keys: bool = False) -> bytes:
+    """Serialize entities, or any JSON-compatible structure that may contain entities, to UTF-8 encoded JSON.
+
+    Relies on orjson if installed, else falls back to the standard json module.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_SORT_KEYS if sort_keys else None)
+    return json.dumps(obj, cls=NgsiEncoder, sort_keys=sort_keys).encode("utf-8")
+
+
+def decode_json(content: bytes):
+    """Deserialize UTF-8 encoded JSON, i.e. the content of a broker response.
+
+    Relies on orjson if installed, else falls back to the standard json module.
+    """
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
 def guess_ngsild_type(attr: Mapping) -> Literal["Property", "GeoProperty", "TemporalProperty", "Relationship"]:
     if not isinstance(attr, Mapping):  # not a NGSI-LD attribute
         raise ValueError("NGSI-LD attribute MUST be a JSON object")
@@ -15,6 +15,14 @@
 import sys
 import importlib.util
 
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import fields
+from typing import Iterable, Iterator, TypeVar
+
+T = TypeVar("T")
+
+_EXHAUSTED = object()
+
 
 def is_interactive() -> bool:
     return hasattr(sys, "ps1") or sys.flags.interactive
@@ -24,8 +32,46 @@ def is_pandas_installed() -> bool:
     return importlib.util.find_spec("pandas") is not None
 
 
+def is_orjson_installed() -> bool:
+    return importlib.util.find_spec("orjson") is not None
+
+
+def is_ijson_installed() -> bool:
+    return importlib.util.find_spec("ijson") is not None
+
+
+def is_h2_installed() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+def slotted(cls: type[T]) -> type[T]:
+    """Rebuild a dataclass with __slots__, as dataclass(slots=True) does from Python 3.10.
+
+    To be applied on top of the @dataclass decorator.
+    Field defaults are kept by the generated __init__, so they can be dropped from the class namespace.
+    """
+    names = tuple(f.name for f in fields(cls))
+    namespace = {k: v for k, v in cls.__dict__.items() if k not in names and k not in ("__dict__", "__weakref__")}
+    namespace["__slots__"] = names
+    return type(cls)(cls.__name__, cls.__bases__, namespace)
+
+
 def _addopt(params: dict, newopt: str):
     if params.get("options", "") == "":
         params["options"] = newopt
     else:
         params["options"] += f",{newopt}"
+
+
+def prefetch(iterable: Iterable[T]) -> Iterator[T]:
+    """Iterate over an iterable, fetching the next item in a background thread.
+
+    Allows to overlap the production of an item (i.e. a broker request) with its consumption.
+    Only one item is fetched in advance.
+    """
+    it = iter(iterable)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        future = executor.submit(next, it, _EXHAUSTED)
+        while (item := future.result()) is not _EXHAUSTED:
+            future = executor.submit(next, it, _EXHAUSTED)
+            yield item
@@ -9,6 +9,7 @@
 #
 # Author: Fabien BATTELLO <fabien.battello@orange.com> et al.
 
+import asyncio
 import logging
 import pytest
 
@@ -262,3 +263,23 @@ async def test_api_batch_delete_ok_204(mocked_connected, httpx_mock: HTTPXMock):
         "urn:ngsi-ld:AirQualityObserved:RZ:Obsv4568",
         "urn:ngsi-ld:AirQualityObserved:RZ:Obsv4569",
     ]
+
+
+@pytest.mark.asyncio
+async def test_api_batch_upsert_concurrent_batches(mocked_connected, mocker):
+    client = AsyncClient()
+    in_flight = peak = 0
+
+    async def upsert(batch, opt):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0)
+        in_flight -= 1
+        return BatchResult("upsert", success=list(batch))
+
+    mocker.patch.object(client._batch, "_upsert", side_effect=upsert)
+    ids = [f"urn:ngsi-ld:AirQualityObserved:RZ:Obsv{i}" for i in range(250)]
+    r: BatchResult = await client.batch.upsert(ids, batchsize=50, concurrency=2)
+    assert peak == 2
+    assert r.success == ids
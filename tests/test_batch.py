@@ -248,3 +248,42 @@ def test_api_batch_delete_ok_204(mocked_connected, requests_mock):
         "urn:ngsi-ld:AirQualityObserved:RZ:Obsv4568",
         "urn:ngsi-ld:AirQualityObserved:RZ:Obsv4569",
     ]
+
+
+def test_api_batch_delete_ids_ok_204(mocked_connected, requests_mock):
+    requests_mock.post("http://localhost:1026/ngsi-ld/v1/entityOperations/delete/", status_code=204)
+    client = Client()
+    ids = ["urn:ngsi-ld:AirQualityObserved:RZ:Obsv4567", "urn:ngsi-ld:AirQualityObserved:RZ:Obsv4568"]
+    r: BatchResult = client.batch.delete(ids)
+    assert r.ok
+    assert r.success == ids
+
+
+def test_api_batch_upsert_concurrent_batches(mocked_connected, mocker):
+    client = Client()
+    mocked_upsert = mocker.patch.object(
+        client._batch, "_upsert", side_effect=lambda batch, opt: BatchResult("upsert", success=list(batch))
+    )
+    ids = [f"urn:ngsi-ld:AirQualityObserved:RZ:Obsv{i}" for i in range(250)]
+    r: BatchResult = client.batch.upsert(ids, concurrency=3)
+    assert mocked_upsert.call_count == 3
+    assert r.success == ids
+
+
+def test_api_batch_upsert_compressed_fallback(mocked_connected, requests_mock):
+    m = requests_mock.post(
+        "http://localhost:1026/ngsi-ld/v1/entityOperations/upsert/",
+        [{"status_code": 415}, {"status_code": 204}],
+    )
+    client = Client(compress=True)
+    batch = []
+    for i in range(100):
+        e = sample_entity.dup()
+        e.id = f"urn:ngsi-ld:AirQualityObserved:RZ:Obsv{i}"
+        batch.append(e)
+    r: BatchResult = client.batch.upsert(batch)
+    assert r.ok
+    assert m.call_count == 2
+    assert m.request_history[0].headers["Content-Encoding"] == "gzip"
+    assert "Content-Encoding" not in m.request_history[1].headers
+    assert not client.compress
@@ -10,17 +10,64 @@
 # Author: Fabien BATTELLO <fabien.battello@orange.com> et al.
 
 import logging
-from ngsildclient.api.client import Client, Vendor
+import pytest
+import socket
+import time
+import requests
+import ngsildclient.api.client
+from pytest_mock.plugin import MockerFixture
+from ngsildclient.api.client import Broker, Client, Vendor
+from ngsildclient.api.batch import BatchResult
+from ngsildclient.api.temporal import Temporal
+from ngsildclient.api.constants import HEALTH_CACHE_TTL, VENDOR_PROBE_TIMEOUT, WARMUP_TIMEOUT
 
 logger = logging.getLogger(__name__)
 
 
 def test_api_is_connected(requests_mock):
-    requests_mock.get("http://localhost:1026/ngsi-ld/v1/entities", status_code=200)
+    requests_mock.head("http://localhost:1026/ngsi-ld/v1/entities", status_code=200)
     client = Client()
     assert client.is_connected()
 
 
+def test_api_is_connected_head_rejected(requests_mock):
+    Client.invalidate_probe_cache()
+    head = requests_mock.head("http://localhost:1026/ngsi-ld/v1/entities", status_code=405)
+    get = requests_mock.get("http://localhost:1026/ngsi-ld/v1/entities", status_code=200)
+    client = Client(verbose=False)
+    assert client.is_connected(raise_for_disconnected=True)
+    assert head.call_count == 1
+    assert get.call_count == 2
+
+
+def test_api_is_connected_head_kept_after_error(requests_mock):
+    Client.invalidate_probe_cache()
+    head = requests_mock.head("http://localhost:1026/ngsi-ld/v1/entities", [{"status_code": 503}, {"status_code": 200}])
+    client = Client(verbose=False, lazy=True)
+    assert not client.is_connected()
+    assert client.is_connected()
+    assert head.call_count == 2
+
+
+def test_api_connect_cached(requests_mock):
+    Client.invalidate_probe_cache()
+    m = requests_mock.head("http://localhost:1026/ngsi-ld/v1/entities", status_code=200)
+    Client(verbose=False)
+    Client(verbose=False)
+    assert m.call_count == 1
+
+
+def test_api_is_connected_cached(requests_mock):
+    Client.invalidate_probe_cache()
+    m = requests_mock.head("http://localhost:1026/ngsi-ld/v1/entities", status_code=200)
+    client = Client(verbose=False, lazy=True)
+    assert client.is_connected()
+    assert client.is_connected()
+    assert m.call_count == 1
+    assert client.is_connected(raise_for_disconnected=True)
+    assert m.call_count == 2
+
+
 def test_api_guess_broker(mocked_connected, requests_mock):
     requests_mock.get(
         "http://localhost:1026/version",
@@ -32,3 +79,236 @@ def test_api_guess_broker(mocked_connected, requests_mock):
     logger.info(f"{vendor=}")
     assert vendor == Vendor.ORIONLD
     assert version == "post-v0.8.1"
+
+
+def test_api_guess_broker_persisted(mocked_connected, requests_mock, monkeypatch, tmp_path):
+    monkeypatch.setattr(ngsildclient.api.client, "VENDOR_CACHE_FILE", tmp_path / "broker.json")
+    Client.invalidate_probe_cache()
+    m = requests_mock.get("http://localhost:1026/version", status_code=200, json={"orionld version": "post-v0.8.1"})
+    Client(persist_vendor=True)
+    Client.invalidate_probe_cache()  # as in a new process
+    client = Client(persist_vendor=True)
+    assert client.broker.vendor == Vendor.ORIONLD
+    assert client.broker.version == "post-v0.8.1"
+    assert m.call_count == 1
+
+
+def test_api_guess_broker_java_spring(mocked_connected, requests_mock):
+    Client.invalidate_probe_cache()
+    requests_mock.get("http://localhost:1026/version", status_code=404)
+    requests_mock.get(
+        "http://localhost:1026/actuator/info",
+        status_code=200,
+        json={"build": {"version": "2.1.0", "group": "eu.neclab.ngsildbroker"}},
+    )
+    client = Client(lazy=True)
+    assert client.guess_vendor() == (Vendor.SCORPIO, "2.1.0")
+
+
+def test_api_guess_broker_probe_timeout(mocked_connected, requests_mock):
+    Client.invalidate_probe_cache()
+    m = requests_mock.get("http://localhost:1026/version", exc=requests.exceptions.ReadTimeout)
+    client = Client(lazy=True)
+    assert client.guess_vendor() == (Vendor.UNKNOWN, "N/A")
+    assert m.last_request.timeout == VENDOR_PROBE_TIMEOUT
+
+
+def test_api_is_connected_refused():
+    with socket.socket() as s:  # a port with nothing listening
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    client = Client(hostname="127.0.0.1", port=port, lazy=True)
+    start = time.monotonic()
+    assert not client.is_connected()
+    assert time.monotonic() - start < 0.5  # not retried
+    client.close()
+
+
+def test_api_guess_broker_probe_not_answering(monkeypatch):
+    monkeypatch.setattr(ngsildclient.api.client, "VENDOR_PROBE_TIMEOUT", 0.3)
+    with socket.socket() as server:  # accepts connections (in the backlog) but never replies
+        server.bind(("127.0.0.1", 0))
+        server.listen()
+        client = Client(hostname="127.0.0.1", port=server.getsockname()[1], lazy=True)
+        start = time.monotonic()
+        assert client.guess_vendor() == (Vendor.UNKNOWN, "N/A")
+        assert time.monotonic() - start < 1  # not retried
+        client.close()
+
+
+def test_api_post_compressed_keeps_headers(mocked_connected, requests_mock):
+    url = "http://localhost:1026/ngsi-ld/v1/entityOperations/query"
+    m = requests_mock.post(url, status_code=200)
+    client = Client(compress=True)
+    client._post(url, {"q": "x" * 20_000}, headers={"Accept": "application/json"})
+    assert m.last_request.headers["Content-Encoding"] == "gzip"
+    assert m.last_request.headers["Accept"] == "application/json"
+
+
+def test_api_upsert_generator(mocked_connected, mocker):
+    client = Client()
+    mocked_upsert = mocker.patch.object(client._batch, "upsert")
+    client.upsert(e for e in ["a", "b"])
+    assert mocked_upsert.call_args.args[0] == ["a", "b"]
+
+
+def test_api_delete_single_id(mocked_connected, mocker):
+    client = Client()
+    mocked_delete = mocker.patch.object(client._entities, "delete")
+    client.delete("urn:ngsi-ld:AgriFarm:001")
+    mocked_delete.assert_called_once_with("urn:ngsi-ld:AgriFarm:001")
+
+
+def test_api_proxy(mocked_connected):
+    client = Client(proxy="http://proxy:3128")
+    assert client.session.proxies == {"http": "http://proxy:3128", "https": "http://proxy:3128"}
+    assert client._probe_session.proxies == client.session.proxies
+
+
+def test_api_wrappers_built_on_first_use(mocked_connected):
+    client = Client()
+    assert "_batch" not in vars(client)
+    assert client.batch is client.batch
+    assert client.batch.url == "http://localhost:1026/ngsi-ld/v1/entityOperations"
+
+
+def test_api_wrappers_cached(mocked_connected):
+    client = Client()
+    assert client.entities is client._entities
+    assert "entities" in vars(client)
+    assert client.version == Client.version
+    assert client._subscriptions is client.subscriptions  # built from the private name first
+    assert client.temporal is client._temporal
+    with pytest.raises(AttributeError):
+        client.unknown
+
+
+def test_api_is_connected_cache_short_lived(requests_mock, monkeypatch):
+    Client.invalidate_probe_cache()
+    m = requests_mock.head("http://localhost:1026/ngsi-ld/v1/entities", status_code=200)
+    now = [1000.0]
+    monkeypatch.setattr(ngsildclient.api.client.time, "monotonic", lambda: now[0])
+    client = Client(verbose=False)
+    now[0] += HEALTH_CACHE_TTL + 1
+    Client(verbose=False)  # connect() still reuses the check
+    assert m.call_count == 1
+    assert client.is_connected()  # is_connected() does not
+    assert m.call_count == 2
+
+
+def test_api_lazy(requests_mock):
+    m = requests_mock.head("http://localhost:1026/ngsi-ld/v1/entities", status_code=200)
+    Client.invalidate_probe_cache()
+    client = Client(lazy=True)
+    assert m.call_count == 0
+    assert client.connect()
+    assert m.call_count == 1
+
+
+def test_api_guess_broker_cached(mocked_connected, requests_mock):
+    Client.invalidate_probe_cache()
+    m = requests_mock.get(
+        "http://localhost:1026/version",
+        status_code=200,
+        json={"orionld version": "post-v0.8.1"},
+    )
+    Client()
+    client = Client()
+    assert client.broker.vendor == Vendor.ORIONLD
+    assert m.call_count == 1
+
+
+def test_api_delete_where_walks_pages_backwards(mocked_connected, mocker):
+    client = Client()
+    mocker.patch.object(client._entities, "_query_ids_page_with_count", return_value=([0], 250))
+    mocked_query = mocker.patch.object(
+        client._entities, "_query_ids_page", side_effect=lambda *args, **kwargs: [kwargs["offset"]]
+    )
+    mocked_delete = mocker.patch.object(
+        client._batch, "_delete", side_effect=lambda ids: BatchResult("delete", success=ids)
+    )
+    r = client.delete_where(type="AgriFarm")
+    assert [c.kwargs["offset"] for c in mocked_query.call_args_list] == [200, 100]
+    assert [c.args[0] for c in mocked_delete.call_args_list] == [[200], [100], [0]]
+    assert r.success == [200, 100, 0]
+
+
+def test_api_delete_where_nothing_to_delete(mocked_connected, mocker):
+    client = Client()
+    mocker.patch.object(client._entities, "_query_ids_page_with_count", return_value=([], 0))
+    mocked_delete = mocker.patch.object(client._batch, "_delete")
+    r = client.delete_where(type="AgriFarm")
+    mocked_delete.assert_not_called()
+    assert r.n_tot == 0
+
+
+def test_api_query_pages_in_order(mocked_connected, mocker):
+    client = Client()
+    mocked_count = mocker.patch.object(client._entities, "count")
+    mocker.patch.object(client._entities, "_query_page_with_count", return_value=([0], 250))
+    mocked_query = mocker.patch.object(
+        client._entities, "_query_page", side_effect=lambda params, ctx, offset, asdict: [offset]
+    )
+    assert client.query(type="AgriFarm", concurrency=3) == [0, 100, 200]
+    assert mocked_query.call_count == 2
+    mocked_count.assert_not_called()
+
+
+def test_api_query_single_page(mocked_connected, mocker):
+    client = Client()
+    mocker.patch.object(client._entities, "_query_page_with_count", return_value=([0, 1], 2))
+    mocked_query = mocker.patch.object(client._entities, "_query_page")
+    assert client.query(type="AgriFarm") == [0, 1]
+    mocked_query.assert_not_called()
+
+
+def test_api_query_generator(mocked_connected, mocker):
+    client = Client()
+    mocker.patch.object(client._entities, "_query_page_with_count", return_value=([0, 1], 5))
+    mocker.patch.object(
+        client._entities, "_query_page", side_effect=lambda params, ctx, offset, asdict: [offset, offset + 1]
+    )
+    assert list(client.query_generator(type="AgriFarm", limit=2)) == [0, 1, 2, 3, 4, 5]
+    assert list(client.query_generator(type="AgriFarm", limit=2, batch=True)) == [[0, 1], [2, 3], [4, 5]]
+
+
+def test_api_purge(mocked_connected, mocker):
+    client = Client()
+    mocker.patch.object(client._types, "list", return_value=["AgriFarm", "AgriParcel"])
+    mocked_delete_where = mocker.patch.object(client, "delete_where")
+    client.purge()
+    assert sorted(c.kwargs["type"] for c in mocked_delete_where.call_args_list) == ["AgriFarm", "AgriParcel"]
+
+
+def test_api_query_fewer_results_than_counted(mocked_connected, mocker):
+    client = Client()
+    mocker.patch.object(client._entities, "_query_page_with_count", return_value=([0] * 2, 250))
+    mocker.patch.object(client._entities, "_query_page", side_effect=lambda params, ctx, offset, asdict: [offset] * 2)
+    assert client.query(type="AgriFarm") == [0, 0, 100, 100, 200, 200]
+
+
+def test_broker_slots():
+    broker = Broker(Vendor.ORIONLD, "1.0.0")
+    assert not hasattr(broker, "__dict__")
+    assert broker == Broker(Vendor.ORIONLD, "1.0.0")
+    assert Broker() == Broker(Vendor.UNKNOWN, "N/A")
+
+
+def test_api_accept_compressed_responses(mocked_connected, requests_mock):
+    m = requests_mock.get("http://localhost:1026/ngsi-ld/v1/entities", status_code=200, json=[])
+    client = Client()
+    client.entities._query_page({"type": "AgriFarm"})
+    assert "gzip" in m.last_request.headers["Accept-Encoding"]
+
+
+def test_api_temporal_warmup(mocked_connected, requests_mock, mocker: MockerFixture):
+    mocked_warmup = mocker.patch.object(Temporal, "warmup")
+    Client()
+    assert mocked_warmup.call_count == 0  # temporal endpoint served by the broker already checked
+    client = Client(port_temporal=8083)
+    assert mocked_warmup.call_count == 1
+    mocker.stopall()
+    m = requests_mock.head("http://localhost:8083/temporal/entities", status_code=405)
+    client.temporal.warmup().join()
+    assert m.call_count == 1
+    assert m.last_request.timeout == WARMUP_TIMEOUT
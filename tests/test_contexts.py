@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+
+# Software Name: ngsildclient
+# SPDX-FileCopyrightText: Copyright (c) 2021 Orange
+# SPDX-License-Identifier: Apache 2.0
+#
+# This software is distributed under the Apache 2.0;
+# see the NOTICE file for more details.
+#
+# Author: Fabien BATTELLO <fabien.battello@orange.com> et al.
+
+import re
+
+from ngsildclient.api.client import Client
+from ngsildclient.model.constants import CORE_CONTEXT
+
+URL_CONTEXTS = "http://localhost:1026/ngsi-ld/v1/jsonldContexts"
+CONTEXTS = [CORE_CONTEXT, "AgriFarmContext", "AgriParcelContext", "WeatherContext"]
+
+
+def test_api_contexts_list_pattern(mocked_connected, requests_mock):
+    requests_mock.get(URL_CONTEXTS, status_code=200, json=CONTEXTS)
+    client = Client()
+    assert client.contexts.list("agri") == ["AgriFarmContext", "AgriParcelContext"]
+
+
+def test_api_contexts_delete_pattern(mocked_connected, requests_mock):
+    requests_mock.get(URL_CONTEXTS, status_code=200, json=CONTEXTS)
+    m = requests_mock.delete(re.compile(f"{URL_CONTEXTS}/.+"), status_code=204)
+    client = Client()
+    assert client.contexts.delete(None, pattern="agri")
+    assert sorted(r.url.rsplit("/", 1)[-1] for r in m.request_history) == ["AgriFarmContext", "AgriParcelContext"]
+
+
+def test_api_contexts_cleanup(mocked_connected, requests_mock):
+    requests_mock.get(URL_CONTEXTS, status_code=200, json=CONTEXTS)
+    m = requests_mock.delete(re.compile(f"{URL_CONTEXTS}/.+"), status_code=204)
+    client = Client()
+    client.contexts.cleanup()
+    assert m.call_count == 3
+
+
+def test_api_contexts_exists_head_not_supported(mocked_connected, requests_mock):
+    client = Client()
+    url = f"{URL_CONTEXTS}/ctx1"
+    head = requests_mock.head(url, status_code=405)
+    get = requests_mock.get(url, status_code=200, json={"@context": {}})
+    assert client.contexts.exists("ctx1")
+    assert client.contexts.exists("ctx1")
+    assert head.call_count == 1
+    assert get.call_count == 2
+
+
+def test_api_contexts_list_kind(mocked_connected, requests_mock):
+    m = requests_mock.get(URL_CONTEXTS, status_code=200, json=CONTEXTS[1:])
+    client = Client()
+    assert client.contexts.list("farm", kind="Hosted") == ["AgriFarmContext"]
+    assert m.last_request.qs["kind"] == ["hosted"]
+
+
+def test_api_contexts_delete_ignore_errors(mocked_connected, requests_mock):
+    requests_mock.delete(f"{URL_CONTEXTS}/ctx1", status_code=404)
+    client = Client(ignore_errors=True)
+    assert client.contexts.delete("ctx1") is False
+
+
+def test_api_contexts_list_kind_not_supported(mocked_connected, requests_mock):
+    details = [
+        {"url": "AgriFarmContext", "kind": "Hosted"},
+        {"url": "AgriParcelContext", "kind": "Cached"},
+        {"url": "WeatherContext", "kind": "Hosted"},
+    ]
+    m = requests_mock.get(URL_CONTEXTS, [{"status_code": 400}, {"status_code": 200, "json": details}])
+    client = Client()
+    assert client.contexts.list("agri", kind="Hosted") == ["AgriFarmContext"]
+    assert m.call_count == 2
+    assert "kind" not in m.last_request.qs
+
+
+def test_api_contexts_list_kind_ignored(mocked_connected, requests_mock):
+    details = [{"url": "AgriFarmContext", "kind": "Hosted"}, {"url": "AgriParcelContext", "kind": "Cached"}]
+    requests_mock.get(URL_CONTEXTS, status_code=200, json=details)
+    client = Client()
+    assert client.contexts.list(kind="Cached") == ["AgriParcelContext"]
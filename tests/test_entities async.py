@@ -26,6 +26,13 @@ from ngsildclient.api.exceptions import (
 logger = logging.getLogger(__name__)
 
 
+def test_api_connection_limits():
+    client = AsyncClient(pool_size=8)
+    pool = client.client._transport._pool
+    assert pool._max_connections == 100
+    assert pool._max_keepalive_connections == 8
+
+
 @pytest.mark.asyncio
 async def test_api_create(httpx_mock: HTTPXMock):
     httpx_mock.add_response(
@@ -106,10 +113,9 @@ async def test_api_retrieve_error_not_found(httpx_mock: HTTPXMock):
 @pytest.mark.asyncio
 async def test_api_exists(httpx_mock: HTTPXMock):
     httpx_mock.add_response(
-        method="GET",
+        method="HEAD",
         url="http://localhost:1026/ngsi-ld/v1/entities/urn:ngsi-ld:AirQualityObserved:RZ:Obsv4567",
         status_code=200,
-        text=sample_entity.to_json(),
     )
     client = AsyncClient()
     res = await client._entities.exists("urn:ngsi-ld:AirQualityObserved:RZ:Obsv4567")
@@ -199,3 +205,11 @@ async def test_api_update_nonexistent_entity(mocker: MockerFixture):
     mocker.patch.object(client._entities, "exists", return_value=False)
     res = await client._entities.update(sample_entity)
     assert res == False
+
+
+@pytest.mark.parametrize("h2_installed", [True, False])
+def test_api_http2_when_h2_installed(mocker: MockerFixture, h2_installed):
+    mocker.patch("ngsildclient.api.asyn.client.is_h2_installed", return_value=h2_installed)
+    mocked_client = mocker.patch("ngsildclient.api.asyn.client.httpx.AsyncClient")
+    AsyncClient()
+    assert mocked_client.call_args.kwargs["http2"] is h2_installed
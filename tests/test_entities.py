@@ -17,6 +17,7 @@ from ngsildclient.api.client import Client
 from ngsildclient.api.exceptions import (
     NgsiAlreadyExistsError,
     NgsiResourceNotFoundError,
+    NgsiHttpError,
     ProblemDetails,
 )
 from .common import sample_entity
@@ -94,7 +95,10 @@ def test_api_retrieve_error_not_found(mocked_connected, requests_mock):
 
 
 def test_api_exists(mocked_connected, requests_mock):
-    requests_mock.get(
+    requests_mock.head(
+        "http://localhost:1026/ngsi-ld/v1/entities/urn:ngsi-ld:AirQualityObserved:RZ:Obsv4567", status_code=200
+    )
+    get = requests_mock.get(
         "http://localhost:1026/ngsi-ld/v1/entities/urn:ngsi-ld:AirQualityObserved:RZ:Obsv4567",
         request_headers={"Accept": "application/ld+json"},
         status_code=200,
@@ -103,6 +107,7 @@ def test_api_exists(mocked_connected, requests_mock):
     client = Client()
     res = client._entities.exists("urn:ngsi-ld:AirQualityObserved:RZ:Obsv4567")
     assert res == True
+    assert get.call_count == 0
 
 
 def test_api_delete(mocked_connected, requests_mock):
@@ -136,6 +141,37 @@ def test_api_delete_error_not_found(mocked_connected, requests_mock):
     assert excinfo.value.problemdetails.extension == {}
 
 
+def test_api_delete_error_extension(mocked_connected, requests_mock):
+    requests_mock.delete(
+        "http://localhost:1026/ngsi-ld/v1/entities/urn:ngsi-ld:AirQualityObserved:RZ:Obsv4568",
+        status_code=404,
+        json={
+            "type": "https://uri.etsi.org/ngsi-ld/errors/ResourceNotFound",
+            "title": "Entity Not Found",
+            "instance": "/ngsi-ld/v1/entities/urn:ngsi-ld:AirQualityObserved:RZ:Obsv4568",
+            "broker": "orion-ld",
+        },
+    )
+    client = Client()
+    with pytest.raises(NgsiResourceNotFoundError) as excinfo:
+        client._entities.delete("urn:ngsi-ld:AirQualityObserved:RZ:Obsv4568")
+    assert excinfo.value.problemdetails.detail is None
+    assert excinfo.value.problemdetails.instance == "/ngsi-ld/v1/entities/urn:ngsi-ld:AirQualityObserved:RZ:Obsv4568"
+    assert excinfo.value.problemdetails.extension == {"broker": "orion-ld"}
+
+
+def test_api_delete_error_no_problem_details(mocked_connected, requests_mock):
+    requests_mock.delete(
+        "http://localhost:1026/ngsi-ld/v1/entities/urn:ngsi-ld:AirQualityObserved:RZ:Obsv4568",
+        status_code=404,
+        text="<html>Not Found</html>",
+    )
+    client = Client()
+    with pytest.raises(NgsiHttpError) as excinfo:
+        client._entities.delete("urn:ngsi-ld:AirQualityObserved:RZ:Obsv4568")
+    assert excinfo.value.statuscode == 404
+
+
 def test_api_upsert_existent_entity(mocked_connected, mocker: MockerFixture):
     client = Client()
     pd = ProblemDetails(
@@ -180,3 +216,81 @@ def test_api_update_nonexistent_entity(mocked_connected, mocker: MockerFixture):
     mocker.patch.object(client._entities, "exists", return_value=False)
     res = client._entities.update(sample_entity)
     assert res is False
+
+
+def test_api_query_ids_page_with_count(mocked_connected, requests_mock):
+    client = Client()
+    m = requests_mock.get(
+        "http://localhost:1026/ngsi-ld/v1/entities",
+        status_code=200,
+        headers={"NGSILD-Results-Count": "2"},
+        json=[
+            {"id": "urn:ngsi-ld:AgriFarm:001", "type": "AgriFarm"},
+            {"id": "urn:ngsi-ld:AgriFarm:002", "type": "AgriFarm"},
+        ],
+    )
+    ids, count = client._entities._query_ids_page_with_count({"type": "AgriFarm"})
+    assert ids == ["urn:ngsi-ld:AgriFarm:001", "urn:ngsi-ld:AgriFarm:002"]
+    assert count == 2
+    assert m.last_request.qs["options"] == ["keyvalues"]
+
+
+def test_api_update_partial(mocked_connected, requests_mock):
+    client = Client()
+    m = requests_mock.patch(f"http://localhost:1026/ngsi-ld/v1/entities/{sample_entity.id}/attrs", status_code=204)
+    assert client._entities.update(sample_entity, partial=True)
+    payload = m.last_request.json()
+    assert "id" not in payload and "type" not in payload
+    assert payload["NO2"]["value"] == 22
+
+
+def test_api_update_partial_nonexistent_entity(mocked_connected, requests_mock):
+    client = Client()
+    requests_mock.patch(f"http://localhost:1026/ngsi-ld/v1/entities/{sample_entity.id}/attrs", status_code=404)
+    assert client._entities.update(sample_entity, partial=True) is False
+
+
+def test_api_to_broker_url(mocked_connected):
+    client = Client()
+    expected = "http://localhost:1026/ngsi-ld/v1/entities/urn:ngsi-ld:AirQualityObserved:RZ:Obsv4567"
+    assert client.entities.to_broker_url(sample_entity) == expected
+    assert client.entities.to_broker_url("AirQualityObserved:RZ:Obsv4567") == expected
+
+
+def test_api_count_alt_posts_json_query(mocked_connected, requests_mock):
+    client = Client()
+    m = requests_mock.post(
+        "http://localhost:1026/ngsi-ld/v1/entityOperations/query",
+        status_code=200,
+        headers={"NGSILD-Results-Count": "3"},
+    )
+    assert client._entities._count_alt({"type": "Query", "entities": [{"type": "AgriFarm"}]}) == 3
+    assert m.last_request.headers["Content-Type"] == "application/json"
+    assert m.last_request.json()["entities"] == [{"type": "AgriFarm"}]
+
+
+def test_api_exists_head_not_supported(mocked_connected, requests_mock):
+    client = Client()
+    url = f"http://localhost:1026/ngsi-ld/v1/entities/{sample_entity.id}"
+    head = requests_mock.head(url, status_code=405)
+    get = requests_mock.get(
+        url, status_code=200, json={"@context": "https://uri.etsi.org/ngsi-ld/v1/ngsi-ld-core-context.jsonld"}
+    )
+    assert client.entities.exists(sample_entity)
+    assert client.entities.exists(sample_entity)
+    assert head.call_count == 1
+    assert get.call_count == 2
+
+
+def test_api_query_page_asdict(mocked_connected, requests_mock):
+    client = Client()
+    payload = [{"id": "urn:ngsi-ld:AgriFarm:001", "type": "AgriFarm"}]
+    requests_mock.get("http://localhost:1026/ngsi-ld/v1/entities", status_code=200, json=payload)
+    assert client._entities._query_page({"type": "AgriFarm"}, asdict=True) == payload
+    assert client._entities._query_page({"type": "AgriFarm"})[0].id == "urn:ngsi-ld:AgriFarm:001"
+
+
+def test_api_to_broker_url_secure(mocked_connected):
+    client = Client(secure=True)
+    expected = "https://localhost:1026/ngsi-ld/v1/entities/urn:ngsi-ld:AirQualityObserved:RZ:Obsv4567"
+    assert client.entities.to_broker_url(sample_entity) == expected
@@ -11,12 +11,13 @@
 
 import pkg_resources
 import json
-from pytest import fixture
+from pytest import fixture, raises
 
 from datetime import datetime
 from dateutil.tz import UTC
 from ngsildclient.model.entity import Entity, mkprop, mkgprop, mktprop, mkrel
 from ngsildclient.model.constants import MultAttrValue
+from ngsildclient.model.exceptions import NgsiMissingTypeError
 from ngsildclient.model.helper.postal import PostalAddressBuilder
 
 
@@ -155,12 +156,40 @@ def test_air_quality_from_dict(expected_air_quality):
     assert e.to_dict() == expected_air_quality
 
 
+def test_from_dicts():
+    payloads = [
+        {"id": "urn:ngsi-ld:AgriFarm:001", "type": "AgriFarm"},
+        {"id": "urn:ngsi-ld:AgriFarm:002", "type": "AgriFarm"},
+    ]
+    entities = Entity.from_dicts(payloads)
+    assert [e.id for e in entities] == ["urn:ngsi-ld:AgriFarm:001", "urn:ngsi-ld:AgriFarm:002"]
+    assert entities[0].to_dict() == Entity.from_dict(payloads[0]).to_dict()
+    with raises(NgsiMissingTypeError):
+        Entity.from_dicts([{"id": "urn:ngsi-ld:AgriFarm:003"}])
+
+
 def test_air_quality_from_json_file(expected_air_quality):
     filename = pkg_resources.resource_filename(__name__, "data/air_quality.json")
     e = Entity.load(filename)
     assert e.to_dict() == expected_air_quality
 
 
+def test_load_batches(tmp_path):
+    rooms = [Entity("RoomObserved", f"Room{i}").prop("temperature", 21.5) for i in range(5)]
+    filename = tmp_path / "rooms.json"
+    filename.write_text(f"[{','.join(room.to_json() for room in rooms)}]")
+    batches = list(Entity.load_batches(filename, 2))
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    assert [e.to_json() for batch in batches for e in batch] == [room.to_json() for room in rooms]
+
+
+def test_load_batches_single_object(tmp_path):
+    filename = tmp_path / "room.json"
+    filename.write_text(Entity("RoomObserved", "Room1").to_json())
+    with raises(ValueError):
+        list(Entity.load_batches(filename, 2))
+
+
 def test_air_quality_with_userdata():
     e = Entity("AirQualityObserved", "AirQualityObserved:RZ:Obsv4567")
     e.tprop("dateObserved", datetime(2018, 8, 7, 12, tzinfo=UTC))
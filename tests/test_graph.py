@@ -9,6 +9,7 @@
 #
 # Author: Fabien BATTELLO <fabien.battello@orange.com> et al.
 
+import sys
 import networkx as nx
 
 from ngsildclient import Entity, MultAttrValue
@@ -162,3 +163,14 @@ def test_graph_4():
     assert edges[2] == (('A', 'A:A1'), ('D', 'D:D1'))
     assert edges[3] == (('A', 'A:A1'), ('D', 'D:D2'))
     assert edges[4] == (('B', 'B:B1'), ('C', 'C:C1'))    
+
+def test_graph_deeper_than_recursion_limit():
+    n = sys.getrecursionlimit() + 100
+    chain = [Entity("A", f"A{i}") for i in range(n)]
+    for a, next_a in zip(chain, chain[1:]):
+        a.rel("hasNext", next_a)
+    client = MockedClient()
+    client.upsert(chain)
+    G: nx.Graph = client.network(chain[0])
+    assert len(G.nodes) == n
+    assert len(G.edges) == n - 1
@@ -9,7 +9,7 @@
 #
 # Author: Fabien BATTELLO <fabien.battello@orange.com> et al.
 
-from ngsildclient.api.helper.subscription import SubscriptionBuilder
+from ngsildclient.api.helper.subscription import SubscriptionBuilder, Subscription, NotificationParams
 
 NOTIF_URI = "http://tutorial:3000/subscription/low-stock-farm001-ngsild"
 
@@ -41,3 +41,20 @@ def test_build_subscription():
         },
         "@context": "https://uri.etsi.org/ngsi-ld/v1/ngsi-ld-core-context.jsonld",
     }
+
+
+def test_subscription_slots():
+    subscr = Subscription(NotificationParams(NOTIF_URI))
+    assert not hasattr(subscr, "__dict__")
+    assert subscr.active is True
+    assert subscr.notification.format == "normalized"
+
+
+def test_subscription_to_dict_inactive():
+    subscr = Subscription(NotificationParams(NOTIF_URI), active=False, entities=[])
+    assert subscr.to_dict() == {
+        "type": "Subscription",
+        "isActive": False,
+        "notification": {"format": "normalized", "endpoint": {"uri": NOTIF_URI, "accept": "application/ld+json"}},
+        "@context": "https://uri.etsi.org/ngsi-ld/v1/ngsi-ld-core-context.jsonld",
+    }
@@ -38,6 +38,14 @@ def test_build_temporal_query_before_str():
     assert tq["timeAt"] == "2022-09-23T12:00:00Z"
 
 
+def test_build_temporal_query_before_now(mocker):
+    mocker.patch(
+        "ngsildclient.api.helper.temporal.utcnow", side_effect=["2022-09-23T12:00:00Z", "2022-09-23T12:00:05Z"]
+    )
+    assert TemporalQuery().before()["timeAt"] == "2022-09-23T12:00:00Z"
+    assert TemporalQuery().before()["timeAt"] == "2022-09-23T12:00:05Z"
+
+
 def test_build_temporal_query_after():
     dt = datetime(2022, 8, 23, 12, 0, 0, tzinfo=UTC)
     tq = TemporalQuery().after(dt)
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+
+# Software Name: ngsildclient
+# SPDX-FileCopyrightText: Copyright (c) 2021 Orange
+# SPDX-License-Identifier: Apache 2.0
+#
+# This software is distributed under the Apache 2.0;
+# see the NOTICE file for more details.
+#
+# Author: Fabien BATTELLO <fabien.battello@orange.com> et al.
+
+import re
+import pytest
+
+from ngsildclient.api.client import Client
+from ngsildclient.api.subscriptions import Subscriptions
+
+URL_SUBSCRIPTIONS = "http://localhost:1026/ngsi-ld/v1/subscriptions"
+SUBSCRIPTION = {
+    "type": "Subscription",
+    "entities": [{"type": "AgriFarm"}],
+    "notification": {"endpoint": {"uri": "http://localhost:8000/notify"}},
+}
+
+
+def test_api_subscriptions_conflicts(mocked_connected, requests_mock):
+    existing = [{"id": "urn:ngsi-ld:Subscription:1", "name": "farms", **SUBSCRIPTION}]
+    requests_mock.get(URL_SUBSCRIPTIONS, status_code=200, json=existing)
+    client = Client()
+    assert client.subscriptions.conflicts(SUBSCRIPTION) == existing
+    assert client.subscriptions.conflicts({**SUBSCRIPTION, "entities": [{"type": "AgriParcel"}]}) == []
+
+
+def test_api_subscriptions_conflicts_not_modified(mocked_connected, requests_mock):
+    existing = [{"id": "urn:ngsi-ld:Subscription:1", **SUBSCRIPTION}]
+    m = requests_mock.get(
+        URL_SUBSCRIPTIONS,
+        [{"status_code": 200, "json": existing, "headers": {"ETag": '"v1"'}}, {"status_code": 304}],
+    )
+    client = Client()
+    assert client.subscriptions.conflicts(SUBSCRIPTION) == existing
+    assert client.subscriptions.conflicts(SUBSCRIPTION) == existing
+    assert m.last_request.headers["If-None-Match"] == '"v1"'
+
+
+def test_api_subscriptions_delete_pattern(mocked_connected, requests_mock):
+    existing = [
+        {"id": f"urn:ngsi-ld:Subscription:{i}", "name": name, **SUBSCRIPTION}
+        for i, name in enumerate(("farms", "parcels", "farmers"))
+    ]
+    requests_mock.get(URL_SUBSCRIPTIONS, status_code=200, json=existing)
+    m = requests_mock.delete(re.compile(f"{URL_SUBSCRIPTIONS}/.+"), status_code=204)
+    client = Client()
+    assert client.subscriptions.delete("farm")
+    assert sorted(r.url.rsplit("/", 1)[-1] for r in m.request_history) == [
+        "urn:ngsi-ld:Subscription:0",
+        "urn:ngsi-ld:Subscription:2",
+    ]
+
+
+def test_api_subscriptions_purge(mocked_connected, requests_mock):
+    existing = [{"id": f"urn:ngsi-ld:Subscription:{i}", **SUBSCRIPTION} for i in range(3)]
+    requests_mock.get(URL_SUBSCRIPTIONS, status_code=200, json=existing)
+    m = requests_mock.delete(re.compile(f"{URL_SUBSCRIPTIONS}/.+"), status_code=204)
+    client = Client()
+    assert client.subscriptions.purge()
+    assert m.call_count == 3
+
+
+def test_api_subscriptions_create_many(mocked_connected, requests_mock):
+    listing = requests_mock.get(URL_SUBSCRIPTIONS, status_code=200, json=[])
+    requests_mock.post(
+        f"{URL_SUBSCRIPTIONS}/",
+        [
+            {"status_code": 201, "headers": {"Location": "/ngsi-ld/v1/subscriptions/urn:ngsi-ld:Subscription:1"}},
+            {"status_code": 201, "headers": {"Location": "/ngsi-ld/v1/subscriptions/urn:ngsi-ld:Subscription:2"}},
+        ],
+    )
+    client = Client()
+    subscrs = [SUBSCRIPTION, {**SUBSCRIPTION, "entities": [{"type": "AgriParcel"}]}]
+    assert client.subscriptions.create_many(subscrs) == ["urn:ngsi-ld:Subscription:1", "urn:ngsi-ld:Subscription:2"]
+    assert listing.call_count == 1
+
+
+def test_api_subscriptions_create_many_conflict(mocked_connected, requests_mock):
+    requests_mock.get(URL_SUBSCRIPTIONS, status_code=200, json=[])
+    m = requests_mock.post(f"{URL_SUBSCRIPTIONS}/", status_code=201)
+    client = Client()
+    with pytest.raises(ValueError):
+        client.subscriptions.create_many([SUBSCRIPTION, {**SUBSCRIPTION, "name": "same criteria"}])
+    assert m.call_count == 0
+
+
+def test_subscriptions_hash_criteria_only():
+    reordered = {
+        "notification": SUBSCRIPTION["notification"],
+        "entities": [{"type": "AgriFarm"}],
+        "type": "Subscription",
+    }
+    hashref = Subscriptions._hash(SUBSCRIPTION)
+    assert Subscriptions._hash({"id": "urn:ngsi-ld:Subscription:1", "name": "farms", **reordered}) == hashref
+    assert Subscriptions._hash({**SUBSCRIPTION, "q": "temperature>30"}) != hashref
+
+
+def test_api_subscriptions_list_not_modified(mocked_connected, requests_mock):
+    existing = [{"id": "urn:ngsi-ld:Subscription:1", "name": "farms", **SUBSCRIPTION}]
+    m = requests_mock.get(
+        URL_SUBSCRIPTIONS,
+        [{"status_code": 200, "json": existing, "headers": {"ETag": '"v1"'}}, {"status_code": 304}],
+    )
+    client = Client()
+    assert client.subscriptions.list() == existing
+    assert client.subscriptions.list("farm") == existing
+    assert m.last_request.headers["If-None-Match"] == '"v1"'
+
+
+def test_api_subscriptions_list_context(mocked_connected, requests_mock):
+    m = requests_mock.get(URL_SUBSCRIPTIONS, status_code=200, json=[])
+    client = Client()
+    client.subscriptions.list(ctx="http://localhost/context.jsonld")
+    assert m.last_request.headers["Link"] == (
+        '<http://localhost/context.jsonld>; rel="http://www.w3.org/ns/json-ld#context"; type="application/ld+json"'
+    )
+    assert "Content-Type" not in m.last_request.headers
+
+
+def test_api_subscriptions_list_returns_copies(mocked_connected, requests_mock):
+    existing = [{"id": "urn:ngsi-ld:Subscription:1", "name": "farms", **SUBSCRIPTION}]
+    requests_mock.get(
+        URL_SUBSCRIPTIONS,
+        [{"status_code": 200, "json": existing, "headers": {"ETag": '"v1"'}}, {"status_code": 304}],
+    )
+    client = Client()
+    client.subscriptions.list()[0]["entities"].append({"type": "AgriParcel"})
+    assert client.subscriptions.conflicts(SUBSCRIPTION) == existing
@@ -9,9 +9,14 @@
 #
 # Author: Fabien BATTELLO <fabien.battello@orange.com> et al.
 
+import requests
+import ngsildclient.api.temporal
+
 from datetime import datetime
 from dateutil.tz import UTC
+from ngsildclient.api.client import Client
 from ngsildclient.api.temporal import _troes_to_dfdict
+from ngsildclient.model.utils import decode_json
 
 troes_1entity_1attr_2measures = [
     {
@@ -124,3 +129,113 @@ def test_to_dfdict_2entities_2attrs_2measures():
         "temperature": [21.7, 21.6, 22.7, 22.6],
         "pressure": [721, 720, 731, 730],
     }
+
+
+def test_api_temporal_query_generator_pages(mocked_connected, requests_mock):
+    troe2 = {**troes_1entity_1attr_2measures[0], "id": "urn:ngsi-ld:RoomObserved:Room2"}
+    m = requests_mock.get(
+        "http://localhost:1026/ngsi-ld/v1/temporal/entities",
+        [
+            {"status_code": 200, "json": troes_1entity_1attr_2measures, "headers": {"Next-Page": "page2"}},
+            {"status_code": 200, "json": [troe2]},
+        ],
+    )
+    client = Client()
+    troes = list(client.temporal.query_generator(type="RoomObserved"))
+    assert [troe["id"] for troe in troes] == ["urn:ngsi-ld:RoomObserved:Room1", "urn:ngsi-ld:RoomObserved:Room2"]
+    assert m.last_request.qs["pageanchor"] == ["page2"]
+
+
+def test_api_temporal_get_not_modified(mocked_connected, requests_mock):
+    m = requests_mock.get(
+        "http://localhost:1026/ngsi-ld/v1/temporal/entities/urn:ngsi-ld:RoomObserved:Room1",
+        [
+            {"status_code": 200, "json": troes_1entity_1attr_2measures[0], "headers": {"ETag": '"v1"'}},
+            {"status_code": 304},
+        ],
+    )
+    client = Client()
+    first = client.temporal.get("RoomObserved:Room1")
+    second = client.temporal.get("RoomObserved:Room1")
+    assert second == first
+    assert m.last_request.headers["If-None-Match"] == '"v1"'
+
+
+def test_api_temporal_get_count_option(mocked_connected, requests_mock):
+    m = requests_mock.get(
+        "http://localhost:1026/ngsi-ld/v1/temporal/entities/urn:ngsi-ld:RoomObserved:Room1",
+        status_code=200,
+        json=troes_1entity_1attr_2measures[0],
+    )
+    client = Client()
+    client.temporal.get("RoomObserved:Room1")
+    assert m.last_request.qs["options"] == ["count,temporalvalues"]
+
+
+def test_api_temporal_alt_query_generator_pages(mocked_connected, requests_mock):
+    troe2 = {**troes_1entity_1attr_2measures[0], "id": "urn:ngsi-ld:RoomObserved:Room2"}
+    m = requests_mock.post(
+        "http://localhost:1026/ngsi-ld/v1/temporal/entityOperations/query",
+        [
+            {"status_code": 200, "json": troes_1entity_1attr_2measures, "headers": {"Next-Page": "page2"}},
+            {"status_code": 200, "json": [troe2]},
+        ],
+    )
+    client = Client()
+    troes = list(client.temporal.alt.query_generator({"type": "Query", "entities": [{"type": "RoomObserved"}]}))
+    assert [troe["id"] for troe in troes] == ["urn:ngsi-ld:RoomObserved:Room1", "urn:ngsi-ld:RoomObserved:Room2"]
+    assert m.last_request.qs["pageanchor"] == ["page2"]
+
+
+def test_api_temporal_query_pages_same_time_frame(mocked_connected, requests_mock):
+    m = requests_mock.get(
+        "http://localhost:1026/ngsi-ld/v1/temporal/entities",
+        [
+            {"status_code": 200, "json": troes_1entity_1attr_2measures, "headers": {"Next-Page": "page2"}},
+            {"status_code": 200, "json": []},
+        ],
+    )
+    client = Client()
+    client.temporal.query(type="RoomObserved")
+    first, second = m.request_history
+    assert first.qs["timeat"] == second.qs["timeat"]
+
+
+def test_api_temporal_query_generator_stopped_early(mocked_connected, requests_mock, monkeypatch):
+    def iter_items(r):
+        with r:
+            yield from decode_json(r.content)
+
+    monkeypatch.setattr(ngsildclient.api.temporal, "is_ijson_installed", lambda: True)
+    monkeypatch.setattr(ngsildclient.api.temporal, "_iter_items", iter_items)
+    closed = []
+    monkeypatch.setattr(requests.Response, "close", lambda r: closed.append(r.url))
+    requests_mock.get(
+        "http://localhost:1026/ngsi-ld/v1/temporal/entities",
+        [
+            {"status_code": 200, "json": troes_2entities_2attrs_2measures, "headers": {"Next-Page": "page2"}},
+            {"status_code": 200, "json": troes_2entities_2attrs_2measures, "headers": {"Next-Page": "page3"}},
+        ],
+    )
+    client = Client()
+    troes = client.temporal.query_generator(type="RoomObserved")
+    next(troes)
+    troes.close()
+    assert len(closed) == 2  # the page being consumed and the page fetched ahead
+    assert "pageAnchor=page2" in closed[1]
+
+
+def test_api_temporal_etag_cache_bounded(mocked_connected, requests_mock, monkeypatch):
+    monkeypatch.setattr(ngsildclient.api.temporal, "ETAG_CACHE_MAX_BYTES", 1000)
+    for i in range(1, 4):
+        requests_mock.get(
+            f"http://localhost:1026/ngsi-ld/v1/temporal/entities/urn:ngsi-ld:RoomObserved:Room{i}",
+            status_code=200,
+            json={**troes_1entity_1attr_2measures[0], "padding": "x" * 150},
+            headers={"ETag": f'"v{i}"'},
+        )
+    client = Client()
+    for i in range(1, 4):
+        client.temporal.get(f"RoomObserved:Room{i}")
+    assert client.temporal._etags_size <= 1000
+    assert [key[0].rsplit(":", 1)[-1] for key in client.temporal._etags] == ["Room2", "Room3"]